@@ -0,0 +1,112 @@
+from typing import Callable, Dict
+
+from httpx import AsyncBaseTransport, AsyncClient, Limits
+
+from api.http_client import AUTH_ENDPOINT, BaseGameApiClient, default_retry_policy
+from api.retry import RetryPolicy
+from api.responses import decode_token
+from core.agents import generate_random_user_agent
+from core.config import config
+from core.logger import logger
+from core.session import SessionStore
+from utils import get_user_data
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class AsyncGameApiClient(BaseGameApiClient):
+    is_async = True
+
+    def __init__(
+        self,
+        base_url: str,
+        http2: bool = False,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 60,
+        transport: AsyncBaseTransport = None,
+        auth_data: Dict = None,
+        retry: RetryPolicy = None,
+        session: SessionStore = None,
+    ):
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+        self.base_url = base_url
+        self.client = AsyncClient(
+            follow_redirects=True,
+            timeout=config.HTTP_TIMEOUT,
+            http2=http2,
+            limits=Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            transport=transport,
+            headers=self.session_headers(generate_random_user_agent()),
+        )
+        self.retry = retry or default_retry_policy()
+        self.auth_token = None
+        self.auth_data = auth_data
+        self.session = session
+
+    async def __aenter__(self) -> "AsyncGameApiClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        if not self._restore_session():
+            await self._login()
+
+    async def _login(self):
+        self._set_auth_token(None)
+        await self._initialize_cookies()
+        await self.set_token(self.auth_data or get_user_data())
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Dict = None,
+        decode: Callable = None,
+    ):
+        steps = self._request_steps(method, endpoint, data, decode)
+        reply = error = None
+        while True:
+            try:
+                step, value = steps.throw(error) if error else steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            reply = error = None
+            try:
+                if step == "send":
+                    reply = await self.client.request(**value)
+                elif step == "login":
+                    await self._login()
+                else:
+                    reply = await self.retry.wait_async(value)
+            except BaseException as e:
+                error = e
+
+    async def _initialize_cookies(self):
+        response = await self.client.get(f"{self.base_url}/telegram")
+        if response.status_code != 200:
+            raise Exception("Failed to initialize cookies")
+
+    async def set_token(self, data):
+        self._store_token(
+            await self._request("POST", AUTH_ENDPOINT, data, decode=decode_token)
+        )
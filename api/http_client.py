@@ -1,27 +1,69 @@
-from typing import Dict
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
 
-from httpx import Client
+from httpx import BaseTransport, Client
 
+from api.responses import decode_tasks, decode_token, decode_user, loads
+from api.retry import ErrorKind, RetryPolicy, classify_error
 from core.agents import generate_random_user_agent
+from core.clock import server_clock
+from core.config import config
+from core.history import history
 from core.logger import log_api_response, logger
+from core.metrics import observe_request, request_status, retries_total
+from core.profiling import profiler
+from core.session import SessionStore
 from utils import get_user_data
 
+AUTH_ENDPOINT = "/api/auth/telegram"
+# POSTs that only read or are harmless to repeat. Every other POST spends
+# coins or claims a reward, so it is not retried once it may have reached
+# the server.
+IDEMPOTENT_POSTS = {AUTH_ENDPOINT, "/api/tasks/get"}
 
-class GameApiClient:
-    def __init__(self, base_url: str):
-        self.base_url = base_url
-        self.client = Client(follow_redirects=True, timeout=10)
-        self.auth_token = None
-        self._initialize_cookies()
-        self.set_token(get_user_data())
+
+def is_idempotent(method: str, endpoint: str) -> bool:
+    return method == "GET" or endpoint in IDEMPOTENT_POSTS
+
+
+def default_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_attempts=config.RETRY_ATTEMPTS,
+        base_delay=config.RETRY_BASE_DELAY,
+        max_delay=config.RETRY_MAX_DELAY,
+        failure_threshold=config.BREAKER_THRESHOLD,
+        reset_timeout=config.BREAKER_RESET,
+    )
+
+
+class BaseGameApiClient(ABC):
+    # Endpoint methods return whatever _request returns, so the same methods
+    # serve the blocking client (a dict) and the async one (a coroutine).
+    is_async = False
+    session: Optional[SessionStore] = None
+
+    def apply_config(self):
+        # Picks up reloaded timeouts and retry settings on the live client,
+        # keeping its connections and session.
+        self.client.timeout = config.HTTP_TIMEOUT
+        self.retry.configure(
+            config.RETRY_ATTEMPTS,
+            config.RETRY_BASE_DELAY,
+            config.RETRY_MAX_DELAY,
+            config.BREAKER_THRESHOLD,
+            config.BREAKER_RESET,
+        )
 
     @staticmethod
-    def get_headers(auth_token=None):
-        headers = {
+    def session_headers(user_agent: str) -> Dict[str, str]:
+        # Built once per client and installed as the httpx default headers, so
+        # requests no longer rebuild the dict or draw a new user agent.
+        return {
             "sec-ch-ua": '"Android WebView";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
             "sec-ch-ua-mobile": "?1",
             "sec-ch-ua-platform": '"Android"',
-            "user-agent": generate_random_user_agent(),
+            "user-agent": user_agent,
             "accept": "application/json, text/plain, */*",
             "content-type": "application/x-www-form-urlencoded",
             "x-requested-with": "org.telegram.messenger",
@@ -31,64 +73,276 @@ class GameApiClient:
             "accept-encoding": "gzip, deflate, br, zstd",
             "accept-language": "en,en-US;q=0.9,ru-RU;q=0.8,ru;q=0.7",
         }
-        if auth_token:
-            headers["Authorization"] = f"Bearer {auth_token}"
-        return headers
 
-    def _request(self, method: str, endpoint: str, data: Dict = None):
+    def _set_auth_token(self, token: Optional[str]):
+        self.auth_token = token
+        if token:
+            self.client.headers["Authorization"] = f"Bearer {token}"
+        else:
+            self.client.headers.pop("Authorization", None)
+
+    @abstractmethod
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Dict = None,
+        decode: Callable = None,
+    ):
+        pass
+
+    def _request_steps(
+        self,
+        method: str,
+        endpoint: str,
+        data: Dict = None,
+        decode: Callable = None,
+    ):
+        # Retry, re-login and bookkeeping shared by both clients, written as a
+        # generator that yields the I/O it needs: ("send", request kwargs),
+        # ("login", None) or ("wait", delay). Each client's _request performs
+        # the step, blocking or awaited, and sends back the response or the
+        # wait's result, or throws in the error it raised.
+        with profiler.span(endpoint, "request", method=method):
+            attempt = 0
+            reauthenticated = False
+            check_breaker = True
+            while True:
+                if check_breaker:
+                    self.retry.before_attempt(endpoint)
+                check_breaker = True
+                try:
+                    result = yield from self._exchange(method, endpoint, data, decode)
+                except Exception as e:
+                    if (
+                        classify_error(e) is ErrorKind.AUTH
+                        and endpoint != AUTH_ENDPOINT
+                        and not reauthenticated
+                    ):
+                        reauthenticated = True
+                        self._token_rejected()
+                        try:
+                            yield "login", None
+                        except BaseException:
+                            self.retry.release(endpoint)
+                            raise
+                        # The same attempt with a new token: the breaker has
+                        # already let it through.
+                        check_breaker = False
+                        continue
+                    delay = self.retry.on_failure(
+                        endpoint, e, attempt, is_idempotent(method, endpoint)
+                    )
+                    if delay is None:
+                        raise
+                    logger.warning(
+                        "Retrying %s in %.1f seconds (attempt %d)",
+                        endpoint,
+                        delay,
+                        attempt + 1,
+                    )
+                    retries_total.inc(endpoint)
+                    if not (yield "wait", delay):
+                        raise
+                    attempt += 1
+                    continue
+                except BaseException:
+                    # Cancelled mid-request: a half-open probe must not stay
+                    # in flight forever.
+                    self.retry.release(endpoint)
+                    raise
+                self.retry.on_success(endpoint)
+                return result
+
+    def _exchange(
+        self,
+        method: str,
+        endpoint: str,
+        data: Dict = None,
+        decode: Callable = None,
+    ):
+        started = time.perf_counter()
+        response = error = None
         try:
-            response = self.client.request(
-                method=method,
-                url=f"{self.base_url}{endpoint}",
-                headers=self.get_headers(self.auth_token),
-                data=data,
+            with profiler.span("http", "request", endpoint=endpoint):
+                sent_at = server_clock.clock()
+                response = yield "send", {
+                    "method": method,
+                    "url": f"{self.base_url}{endpoint}",
+                    "data": data,
+                    "extensions": profiler.http_extensions(endpoint, self.is_async),
+                }
+            server_clock.observe_date_header(
+                response.headers.get("date"), sent_at, server_clock.clock()
             )
             response.raise_for_status()
 
-            if endpoint != "/telegram":
-                log_api_response(logger, endpoint, response.json())
+            if endpoint == "/telegram":
+                return response
 
-            return response.json() if endpoint != "/telegram" else response
+            with profiler.span("parse", "request", endpoint=endpoint):
+                payload = loads(response.content)
+            with profiler.span("log", "request", endpoint=endpoint):
+                log_api_response(logger, endpoint, payload)
+            with profiler.span("decode", "request", endpoint=endpoint):
+                return decode(payload) if decode else payload
         except Exception as e:
+            error = e
             log_api_response(logger, endpoint, str(e), status="error")
-            logger.error(f"API request failed: {endpoint} - {str(e)}")
+            logger.error("API request failed: %s - %s", endpoint, e)
             raise
+        finally:
+            self._record_request(endpoint, started, response, error)
 
-    def _initialize_cookies(self):
-        response = self.client.get(
-            f"{self.base_url}/telegram",
-            headers=self.get_headers(),
-        )
-        if response.status_code != 200:
-            raise Exception("Failed to initialize cookies")
+    @staticmethod
+    def _record_request(endpoint: str, started: float, response=None, error=None):
+        duration = time.perf_counter() - started
+        status = request_status(response, error)
+        observe_request(endpoint, duration, status, response)
+        history.record_request(endpoint, status, duration)
 
-    def set_token(self, data):
-        response = self._request("POST", "/api/auth/telegram", data)
-        self.auth_token = response["token"]
+    def _restore_session(self) -> bool:
+        # A saved token is trusted until the server answers 401; there is no
+        # proactive refresh.
+        if self.session is None or not self.session.data.token:
+            return False
+        for cookie in self.session.data.cookies:
+            self.client.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+        self._set_auth_token(self.session.data.token)
+        logger.info("Reusing saved session from %s", self.session.path)
+        return True
+
+    def _store_token(self, token: str):
+        self._set_auth_token(token)
+        if self.session is not None:
+            self.session.update(
+                token=token,
+                token_obtained_at=time.time(),
+                cookies=[
+                    {
+                        "name": cookie.name,
+                        "value": cookie.value,
+                        "domain": cookie.domain,
+                        "path": cookie.path,
+                    }
+                    for cookie in self.client.cookies.jar
+                ],
+            )
+
+    def _token_rejected(self):
+        if self.session is None or self.session.data.token != self.auth_token:
+            return
+        obtained_at = self.session.data.token_obtained_at
+        if obtained_at:
+            lifetime = time.time() - obtained_at
+            logger.info("Auth token rejected after %.0f minutes", lifetime / 60)
+            self.session.update(token_lifetime=lifetime)
+        self.session.clear_token()
 
     def get_user(self):
-        return self._request("GET", "/api/user/get")
+        return self._request("GET", "/api/user/get", decode=decode_user)
 
     def get_shield(self):
-        return self._request("POST", "/api/boost/buy", {"id": 2, "method": "coin"})
+        return self._request(
+            "POST", "/api/boost/buy", {"id": 2, "method": "coin"}, decode=decode_user
+        )
 
     def get_shield_immunity(self):
-        return self._request("POST", "/api/boost/buy", {"id": 3, "method": "free"})
+        return self._request(
+            "POST", "/api/boost/buy", {"id": 3, "method": "free"}, decode=decode_user
+        )
 
     def get_fuel(self):
-        return self._request("POST", "/api/boost/buy", {"id": 1, "method": "coin"})
+        return self._request(
+            "POST", "/api/boost/buy", {"id": 1, "method": "coin"}, decode=decode_user
+        )
 
     def get_roulette(self):
-        return self._request("POST", "/api/roulette/buy", {"method": "free"})
+        return self._request(
+            "POST", "/api/roulette/buy", {"method": "free"}, decode=decode_user
+        )
 
     def claim(self):
-        return self._request("POST", "/api/game/claiming")
+        return self._request("POST", "/api/game/claiming", decode=decode_user)
 
     def get_daily(self):
-        return self._request("POST", "/api/user/daily_claim", {"method": "ordinary"})
+        return self._request(
+            "POST", "/api/user/daily_claim", {"method": "ordinary"}, decode=decode_user
+        )
 
     def get_onclick_task(self):
-        return self._request("POST", "/api/tasks/onclick")
+        return self._request("POST", "/api/tasks/onclick", decode=decode_user)
 
     def get_tasks(self):
-        return self._request("POST", "/api/tasks/get", {"category": "sponsors"})
+        return self._request(
+            "POST", "/api/tasks/get", {"category": "sponsors"}, decode=decode_tasks
+        )
+
+
+class GameApiClient(BaseGameApiClient):
+    def __init__(
+        self,
+        base_url: str,
+        transport: BaseTransport = None,
+        auth_data: Dict = None,
+        retry: RetryPolicy = None,
+        session: SessionStore = None,
+    ):
+        self.base_url = base_url
+        self.client = Client(
+            follow_redirects=True,
+            timeout=config.HTTP_TIMEOUT,
+            transport=transport,
+            headers=self.session_headers(generate_random_user_agent()),
+        )
+        self.retry = retry or default_retry_policy()
+        self.auth_token = None
+        self.auth_data = auth_data
+        self.session = session
+        if not self._restore_session():
+            self._login()
+
+    def _login(self):
+        self._set_auth_token(None)
+        self._initialize_cookies()
+        self.set_token(self.auth_data or get_user_data())
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Dict = None,
+        decode: Callable = None,
+    ):
+        steps = self._request_steps(method, endpoint, data, decode)
+        reply = error = None
+        while True:
+            try:
+                step, value = steps.throw(error) if error else steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            reply = error = None
+            try:
+                if step == "send":
+                    reply = self.client.request(**value)
+                elif step == "login":
+                    self._login()
+                else:
+                    reply = self.retry.wait(value)
+            except BaseException as e:
+                error = e
+
+    def _initialize_cookies(self):
+        response = self.client.get(f"{self.base_url}/telegram")
+        if response.status_code != 200:
+            raise Exception("Failed to initialize cookies")
+
+    def set_token(self, data):
+        self._store_token(
+            self._request("POST", AUTH_ENDPOINT, data, decode=decode_token)
+        )
@@ -0,0 +1,26 @@
+import json
+
+from core.model import TaskList, User
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(content: bytes):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def decode_token(payload: dict) -> str:
+    return payload["token"]
+
+
+def decode_user(payload: dict) -> User:
+    return User.from_response(payload["user"])
+
+
+def decode_tasks(payload: dict) -> TaskList:
+    return TaskList.from_response(payload["listCompleted"])
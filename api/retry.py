@@ -0,0 +1,266 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Callable, Dict, Optional, Set, Tuple
+
+import httpx
+
+
+class ErrorKind(Enum):
+    TIMEOUT = "timeout"
+    NETWORK = "network"
+    SERVER = "server"
+    RATE_LIMITED = "rate_limited"
+    AUTH = "auth"
+    CLIENT = "client"
+    UNKNOWN = "unknown"
+
+
+RETRYABLE = {
+    ErrorKind.TIMEOUT,
+    ErrorKind.NETWORK,
+    ErrorKind.SERVER,
+    ErrorKind.RATE_LIMITED,
+}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(
+            f"Circuit open for {endpoint}, next attempt in {retry_in:.0f} seconds"
+        )
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def classify_error(error: Exception) -> ErrorKind:
+    if isinstance(error, httpx.TimeoutException):
+        return ErrorKind.TIMEOUT
+    if isinstance(error, httpx.TransportError):
+        return ErrorKind.NETWORK
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status == 401:
+            return ErrorKind.AUTH
+        if status == 429:
+            return ErrorKind.RATE_LIMITED
+        if status >= 500:
+            return ErrorKind.SERVER
+        return ErrorKind.CLIENT
+    return ErrorKind.UNKNOWN
+
+
+def never_sent(error: Exception) -> bool:
+    # True when the server cannot have acted on the request: the connection
+    # was never made, or the server turned it away with 429.
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    return classify_error(error) is ErrorKind.RATE_LIMITED
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    value = error.response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class CircuitBreaker:
+    # closed -> open after failure_threshold consecutive failures; once the
+    # open period has passed a single probe is let through (half-open), and
+    # its outcome closes or re-opens the circuit.
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.open_until: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.open_until is None:
+            return "closed"
+        if self._probing or self.retry_in() == 0:
+            return "half_open"
+        return "open"
+
+    def retry_in(self) -> float:
+        if self.open_until is None:
+            return 0.0
+        return max(0.0, self.open_until - self.clock())
+
+    def allow(self) -> bool:
+        if self.open_until is None:
+            return True
+        if self._probing or self.retry_in() > 0:
+            return False
+        self._probing = True
+        return True
+
+    def release(self):
+        # Ends a probe whose outcome says nothing about the endpoint's health,
+        # so the next caller can probe again.
+        self._probing = False
+
+    def open_for(self, seconds: float):
+        self.open_until = self.clock() + seconds
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.open_until = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.open_until is not None or self.failures >= self.failure_threshold:
+            self.open_for(self.reset_timeout)
+        self._probing = False
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 1,
+        max_delay: float = 60,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.random = rng or random.Random()
+        self.clock = clock
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._cancelled = threading.Event()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        # Wakes every pending backoff wait and turns later ones into an
+        # immediate give-up; used on shutdown. Safe to call from any thread.
+        self._cancelled.set()
+        for loop, waiter in list(self._waiters):
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def wait(self, delay: float) -> bool:
+        # Blocking backoff for the sync client. False means cancelled: the
+        # request should give up instead of retrying.
+        return not self._cancelled.wait(delay)
+
+    async def wait_async(self, delay: float) -> bool:
+        if self._cancelled.is_set():
+            return False
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.add((loop, waiter))
+        try:
+            await asyncio.wait_for(waiter, delay)
+        except asyncio.TimeoutError:
+            return True
+        finally:
+            self._waiters.discard((loop, waiter))
+        return False
+
+    def configure(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        failure_threshold: int,
+        reset_timeout: float,
+    ):
+        # Applies to the next attempt; open circuits keep their current deadline.
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        for breaker in self.breakers.values():
+            breaker.failure_threshold = failure_threshold
+            breaker.reset_timeout = reset_timeout
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers[endpoint] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout, self.clock
+            )
+        return breaker
+
+    def before_attempt(self, endpoint: str):
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(endpoint, breaker.retry_in())
+
+    def on_success(self, endpoint: str):
+        self.breaker(endpoint).record_success()
+
+    def release(self, endpoint: str):
+        self.breaker(endpoint).release()
+
+    def on_failure(
+        self, endpoint: str, error: Exception, attempt: int, idempotent: bool = True
+    ) -> Optional[float]:
+        # Returns how long to wait before the next attempt, or None to give up.
+        # A non-idempotent request is only retried if it never reached the
+        # server; after a read timeout it may already have been applied.
+        kind = classify_error(error)
+        breaker = self.breaker(endpoint)
+        if kind not in RETRYABLE:
+            # A 4xx means the server is up and answered, so it counts as healthy.
+            # Anything else (a 401, a body that did not decode) proves nothing
+            # either way, but must not leave a half-open probe in flight.
+            if kind is ErrorKind.CLIENT:
+                breaker.record_success()
+            else:
+                breaker.release()
+            return None
+
+        breaker.record_failure()
+        if attempt + 1 >= self.max_attempts or breaker.open_until is not None:
+            return None
+        if not idempotent and not never_sent(error):
+            return None
+
+        # Full jitter keeps concurrent retries from synchronising.
+        ceiling = min(self.max_delay, self.base_delay * 2**attempt)
+        delay = self.random.uniform(0, ceiling)
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                breaker.open_for(retry_after)
+                return None
+            delay = max(delay, retry_after)
+        return delay
@@ -0,0 +1,324 @@
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timezone
+from email.utils import formatdate
+from typing import Callable, Dict, Optional
+from urllib import parse
+
+import httpx
+
+from core.model import CLAIM_COOLDOWN, IMMUNITY_COOLDOWN, FuelLevel
+
+CLAIM_REWARD = 1.5
+SHIELD_COST = 15
+SHIELD_DURATION = 3 * 3600
+DAILY_REWARD = 5
+DAILY_INTERVAL = 23 * 3600
+ROULETTE_REWARD = 2
+TASK_REWARD = 1
+
+# Claim and immunity cooldowns are the bot's own (core.model); the server
+# reports the other deadlines directly as daily_next_at and spin_after_at.
+ROULETTE_COOLDOWN = 3600
+TASK_COOLDOWN = 3600
+
+# Bound at import so benchmarks that intercept asyncio.sleep to record the
+# bot's pacing still wait for simulated network latency.
+_async_sleep = asyncio.sleep
+
+ENDPOINTS = (
+    "/telegram",
+    "/api/auth/telegram",
+    "/api/user/get",
+    "/api/boost/buy",
+    "/api/roulette/buy",
+    "/api/game/claiming",
+    "/api/user/daily_claim",
+    "/api/tasks/onclick",
+    "/api/tasks/get",
+)
+
+
+class MockGameServer:
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.time,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        endpoint_errors: Optional[Dict[str, float]] = None,
+        slow_rate: float = 0.0,
+        slow_latency: float = 1.0,
+        seed: Optional[int] = None,
+        enforce_cooldowns: bool = True,
+    ):
+        self.clock = clock
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.endpoint_errors = endpoint_errors or {}
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.random = random.Random(seed)
+        self.enforce_cooldowns = enforce_cooldowns
+
+        self.token = "mock-token"
+        self.hits = Counter()
+        self.errors = Counter()
+        self.balance = 20.0
+        self.level_fuel = 1
+        self.shield = 0
+        self.shield_until = 0.0
+        self.claimed_last = None
+        self.daily_next_at = None
+        self.fuel_last_at = None
+        self.shield_immunity_at = None
+        self.spin_after_at = None
+        self.task_completed_at = None
+
+    def _timestamp(self, value: Optional[float]) -> Optional[str]:
+        if value is None:
+            return None
+        # UTC with a "Z" suffix, as the real API sends them.
+        return (
+            datetime.fromtimestamp(value, timezone.utc)
+            .isoformat()
+            .replace("+00:00", "Z")
+        )
+
+    def user_payload(self) -> dict:
+        now = self.clock()
+        return {
+            "balance": round(self.balance, 2),
+            "level_fuel": self.level_fuel,
+            "shield": self.shield,
+            "shield_active": self.shield_until > now,
+            "tech_work": False,
+            "claimed_last": self._timestamp(self.claimed_last),
+            "daily_next_at": self._timestamp(self.daily_next_at),
+            "fuel_last_at": self._timestamp(self.fuel_last_at),
+            "shield_immunity_at": self._timestamp(self.shield_immunity_at),
+            "shield_free_after_at": self._timestamp(self.shield_until or None),
+            "spin_after_at": self._timestamp(self.spin_after_at),
+        }
+
+    def delay(self) -> float:
+        delay = self.latency
+        if self.jitter:
+            delay += self.random.uniform(0, self.jitter)
+        if self.slow_rate and self.random.random() < self.slow_rate:
+            delay += self.slow_latency
+        return delay
+
+    def _injected_error(self, path: str) -> Optional[httpx.Response]:
+        rate = self.endpoint_errors.get(path, self.error_rate)
+        if not rate or self.random.random() >= rate:
+            return None
+        self.errors[path] += 1
+        headers = {"Retry-After": "1"} if self.error_status == 429 else None
+        return httpx.Response(
+            self.error_status, json={"message": "injected error"}, headers=headers
+        )
+
+    def _ok(self) -> httpx.Response:
+        return httpx.Response(200, json={"user": self.user_payload()})
+
+    def _refused(self, message: str) -> httpx.Response:
+        return httpx.Response(400, json={"message": message})
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        response = self._route(request)
+        response.headers["Date"] = formatdate(self.clock(), usegmt=True)
+        return response
+
+    def _route(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.hits[path] += 1
+
+        error = self._injected_error(path)
+        if error is not None:
+            return error
+
+        if path == "/telegram":
+            return httpx.Response(
+                200, text="<html></html>", headers={"set-cookie": "session=mock"}
+            )
+        if path == "/api/auth/telegram":
+            return httpx.Response(200, json={"token": self.token})
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            return httpx.Response(401, json={"message": "Unauthenticated."})
+
+        form = dict(parse.parse_qsl(request.content.decode()))
+        handler = {
+            "/api/user/get": self._get_user,
+            "/api/boost/buy": self._buy_boost,
+            "/api/roulette/buy": self._roulette,
+            "/api/game/claiming": self._claim,
+            "/api/user/daily_claim": self._daily,
+            "/api/tasks/onclick": self._onclick,
+            "/api/tasks/get": self._tasks,
+        }.get(path)
+        if handler is None:
+            return httpx.Response(404, json={"message": "Not found"})
+        now = self.clock()
+        if not self.enforce_cooldowns:
+            self._reset_cooldowns()
+        return handler(form, now)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        delay = self.delay()
+        if delay:
+            await _async_sleep(delay)
+        return self.handle(request)
+
+    def handle_blocking(self, request: httpx.Request) -> httpx.Response:
+        delay = self.delay()
+        if delay:
+            time.sleep(delay)
+        return self.handle(request)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle_blocking)
+
+    def async_transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle_async)
+
+    def _reset_cooldowns(self):
+        self.claimed_last = None
+        self.daily_next_at = None
+        self.fuel_last_at = None
+        self.shield_immunity_at = None
+        self.spin_after_at = None
+        self.task_completed_at = None
+        self.balance = max(self.balance, SHIELD_COST + 5)
+
+    def _get_user(self, form: dict, now: float) -> httpx.Response:
+        return self._ok()
+
+    def _buy_boost(self, form: dict, now: float) -> httpx.Response:
+        boost_id = form.get("id")
+        if boost_id == "1":
+            delay = FuelLevel.from_level(self.level_fuel).delay * 60
+            if self.fuel_last_at and now < self.fuel_last_at + delay:
+                return self._refused("Fuel is not ready")
+            self.fuel_last_at = now
+        elif boost_id == "2":
+            if self.balance <= SHIELD_COST:
+                return self._refused("Not enough coins")
+            self.balance -= SHIELD_COST
+            self.shield += 1
+            self.shield_until = now + SHIELD_DURATION
+        elif boost_id == "3":
+            if (
+                self.shield_immunity_at
+                and now < self.shield_immunity_at + IMMUNITY_COOLDOWN
+            ):
+                return self._refused("Immunity is not ready")
+            self.shield_immunity_at = now
+        else:
+            return self._refused("Unknown boost")
+        return self._ok()
+
+    def _roulette(self, form: dict, now: float) -> httpx.Response:
+        if self.spin_after_at and now < self.spin_after_at:
+            return self._refused("Spin is not ready")
+        self.balance += ROULETTE_REWARD
+        self.spin_after_at = now + ROULETTE_COOLDOWN
+        return self._ok()
+
+    def _claim(self, form: dict, now: float) -> httpx.Response:
+        if self.claimed_last and now < self.claimed_last + CLAIM_COOLDOWN:
+            return self._refused("Claim is not ready")
+        self.balance += CLAIM_REWARD * self.level_fuel
+        self.claimed_last = now
+        return self._ok()
+
+    def _daily(self, form: dict, now: float) -> httpx.Response:
+        if self.daily_next_at and now < self.daily_next_at:
+            return self._refused("Daily reward already claimed")
+        self.balance += DAILY_REWARD
+        self.daily_next_at = now + DAILY_INTERVAL
+        return self._ok()
+
+    def _onclick(self, form: dict, now: float) -> httpx.Response:
+        if self.task_completed_at and now < self.task_completed_at + TASK_COOLDOWN:
+            return self._refused("Task is not ready")
+        self.balance += TASK_REWARD
+        self.task_completed_at = now
+        return self._ok()
+
+    def _tasks(self, form: dict, now: float) -> httpx.Response:
+        completed = []
+        if self.task_completed_at and now < self.task_completed_at + TASK_COOLDOWN:
+            completed.append({"locale_time": self._timestamp(self.task_completed_at)})
+        return httpx.Response(200, json={"listCompleted": completed})
+
+
+class MockHttpServer:
+    # Serves a MockGameServer over real HTTP on 127.0.0.1, so clients go
+    # through their own transport, connection pool and sockets.
+    def __init__(self, game: MockGameServer, port: int = 0):
+        self.game = game
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="mock-http", daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, every
+            # response would wait out the client's delayed ACK.
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = httpx.Request(
+                    self.command,
+                    f"{server.base_url}{self.path}",
+                    headers=list(self.headers.items()),
+                    content=self.rfile.read(length),
+                )
+                delay = server.game.delay()
+                if delay:
+                    time.sleep(delay)
+                with server._lock:
+                    response = server.game.handle(request)
+                # send_response would add its own Date header on the real clock.
+                self.send_response_only(response.status_code)
+                for name, value in response.headers.multi_items():
+                    if name.lower() not in ("content-length", "transfer-encoding"):
+                        self.send_header(name, value)
+                self.send_header("Content-Length", str(len(response.content)))
+                self.end_headers()
+                self.wfile.write(response.content)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MockHttpServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,227 @@
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from api.async_http_client import AsyncGameApiClient
+from api.http_client import GameApiClient
+from benchmarks.mock_server import MockGameServer
+from benchmarks.simulate import VirtualClock, VirtualTokenBucket
+from benchmarks.startup import bench_startup
+from bot.dashboard import Dashboard
+from bot.game_bot import GameBot
+from core.config import config
+
+BASE_URL = "http://mock.game"
+AUTH_DATA = {"query_id": "benchmark", "hash": "0"}
+
+CLIENT_CALLS = (
+    ("/api/user/get", "get_user"),
+    ("/api/tasks/get", "get_tasks"),
+    ("/api/game/claiming", "claim"),
+    ("/api/boost/buy", "get_fuel"),
+    ("/api/roulette/buy", "get_roulette"),
+    ("/api/user/daily_claim", "get_daily"),
+    ("/api/tasks/onclick", "get_onclick_task"),
+)
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+    }
+
+
+def measure_allocations(run: Callable[[], None], count: int) -> Dict[str, float]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        run()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return {
+        "alloc_blocks_per_call": sum(max(0, s.count_diff) for s in stats) / count,
+        "peak_kib": peak / 1024,
+    }
+
+
+def bench_sync_client(
+    requests: int, latency: float, error_rate: float
+) -> Dict[str, Dict[str, float]]:
+    server = MockGameServer(latency=latency, enforce_cooldowns=False)
+    client = GameApiClient(BASE_URL, transport=server.transport(), auth_data=AUTH_DATA)
+    server.error_rate = error_rate
+    results = {}
+    for endpoint, method_name in CLIENT_CALLS:
+        method = getattr(client, method_name)
+        samples = []
+        cpu_start = time.process_time()
+        for _ in range(requests):
+            started = time.perf_counter()
+            try:
+                method()
+            except Exception:
+                pass
+            samples.append(time.perf_counter() - started)
+        result = summarize(samples)
+        result["cpu_ms_per_call"] = (time.process_time() - cpu_start) * 1000 / requests
+
+        def run():
+            for _ in range(requests):
+                try:
+                    method()
+                except Exception:
+                    pass
+
+        result.update(measure_allocations(run, requests))
+        results[f"sync {endpoint} {method_name}"] = result
+    return results
+
+
+async def bench_async_client(
+    requests: int, latency: float, error_rate: float
+) -> Dict[str, Dict[str, float]]:
+    server = MockGameServer(latency=latency, enforce_cooldowns=False)
+    results = {}
+    async with AsyncGameApiClient(
+        BASE_URL, transport=server.async_transport(), auth_data=AUTH_DATA
+    ) as client:
+        server.error_rate = error_rate
+        for endpoint, method_name in CLIENT_CALLS:
+            method = getattr(client, method_name)
+            samples = []
+            cpu_start = time.process_time()
+            for _ in range(requests):
+                started = time.perf_counter()
+                try:
+                    await method()
+                except Exception:
+                    pass
+                samples.append(time.perf_counter() - started)
+            result = summarize(samples)
+            result["cpu_ms_per_call"] = (
+                (time.process_time() - cpu_start) * 1000 / requests
+            )
+            results[f"async {endpoint} {method_name}"] = result
+    return results
+
+
+async def bench_cycle(latency: float) -> Dict[str, float]:
+    # Token waits inside the cycle advance a virtual clock instead of
+    # sleeping, so wall time measures the request path and "slept_s" shows
+    # how long the cycle would have been held back by pacing.
+    server = MockGameServer(latency=latency)
+    clock = VirtualClock(time.monotonic())
+
+    async with AsyncGameApiClient(
+        BASE_URL, transport=server.async_transport(), auth_data=AUTH_DATA
+    ) as client:
+        bot = GameBot(client, dashboard=Dashboard())
+        bot.executor.limiter = VirtualTokenBucket(
+            config.ACTION_RATE, config.ACTION_BURST, clock
+        )
+        bot.cache.put_user(await client.get_user())
+        server.hits.clear()
+
+        try:
+            cpu_start = time.process_time()
+            started = time.perf_counter()
+            await bot._process_cycle()
+            wall = time.perf_counter() - started
+            cpu = time.process_time() - cpu_start
+        finally:
+            bot.executor.cancel_pending()
+
+    return {
+        "requests_per_cycle": sum(server.hits.values()),
+        "cycle_wall_ms": wall * 1000,
+        "cycle_cpu_ms": cpu * 1000,
+        "slept_s": bot.last_report.waited,
+    }
+
+
+def flatten(results: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    return {
+        f"{group}.{metric}": value
+        for group, metrics in results.items()
+        for metric, value in metrics.items()
+    }
+
+
+def compare(
+    current: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[str]:
+    # Every metric here is lower-is-better; tiny absolute values are noise.
+    regressions = []
+    for name, value in current.items():
+        previous = baseline.get(name)
+        if previous is None or value <= previous * (1 + tolerance):
+            continue
+        if abs(value - previous) < 0.05:
+            continue
+        regressions.append(f"{name}: {previous:.3f} -> {value:.3f}")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, float]]):
+    for group, metrics in results.items():
+        line = ", ".join(f"{metric}={value:.3f}" for metric, value in metrics.items())
+        print(f"{group}: {line}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark GameApiClient and a GameBot cycle against a mock server."
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--startup-runs", type=int, default=5, help="0 skips the startup benchmark"
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    results.update(bench_sync_client(args.requests, args.latency, args.error_rate))
+    results.update(
+        asyncio.run(bench_async_client(args.requests, args.latency, args.error_rate))
+    )
+    results["cycle"] = asyncio.run(bench_cycle(args.latency))
+    if args.startup_runs > 0:
+        results["startup"] = bench_startup(args.startup_runs)
+    print_results(results)
+
+    current = flatten(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
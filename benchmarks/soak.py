@@ -0,0 +1,331 @@
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from api.async_http_client import AsyncGameApiClient
+from api.http_client import GameApiClient
+from benchmarks.mock_server import MockGameServer, MockHttpServer
+from benchmarks.run import percentile
+from benchmarks.simulate import (
+    AUTH_DATA,
+    SimulatedBot,
+    VirtualClock,
+    VirtualRetryPolicy,
+)
+from core.clock import server_clock
+from core.config import config
+from core.logger import close_logger, setup_logger
+
+# metric -> (relative, absolute): a metric fails when its fitted growth over
+# the measured part of the run exceeds both its starting value times relative
+# and the absolute floor. Counts of handles must not grow at all.
+LIMITS = {
+    "rss_mib": (0.05, 4.0),
+    "objects": (0.05, 5000),
+    "fds": (0.0, 1.5),
+    "sockets": (0.0, 1.5),
+    "threads": (0.0, 1.5),
+    "tasks": (0.0, 1.5),
+    "log_handlers": (0.0, 0.5),
+    "log_mib": (0.05, 0.5),
+    "cycle_p50_ms": (0.5, 2.0),
+    "cycle_p95_ms": (0.5, 10.0),
+}
+
+
+@dataclass
+class Sample:
+    hours: float
+    rss_mib: Optional[float]
+    objects: int
+    fds: Optional[int]
+    sockets: Optional[int]
+    threads: int
+    tasks: int
+    log_handlers: int
+    log_mib: float
+    cycles: int
+    cycle_p50_ms: Optional[float]
+    cycle_p95_ms: Optional[float]
+
+
+@dataclass
+class SoakResult:
+    days: float
+    client: str
+    cycles: int
+    requests: int
+    errors: int
+    wall_s: float
+    stopped_early: bool
+    samples: List[Sample] = field(default_factory=list)
+    trends: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    failures: List[str] = field(default_factory=list)
+
+
+def rss_mib() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def open_fds() -> Tuple[Optional[int], Optional[int]]:
+    # (all descriptors, sockets), from /proc or /dev/fd; None elsewhere.
+    for directory in ("/proc/self/fd", "/dev/fd"):
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        sockets = 0
+        for name in names:
+            try:
+                sockets += os.readlink(f"{directory}/{name}").startswith("socket:")
+            except OSError:
+                pass
+        return len(names), sockets if directory == "/proc/self/fd" else None
+    return None, None
+
+
+def log_handlers() -> int:
+    loggers = [logging.getLogger()] + [
+        item
+        for item in logging.Logger.manager.loggerDict.values()
+        if isinstance(item, logging.Logger)
+    ]
+    return sum(len(item.handlers) for item in loggers)
+
+
+def dir_mib(path: str) -> float:
+    # Live logs, raw segments and archives together; bounded by the archive
+    # budget once rotation and pruning keep up.
+    return sum(entry.stat().st_size for entry in os.scandir(path)) / 2**20
+
+
+class SoakBot(SimulatedBot):
+    # The run loop is GameBot's own; only its waits move a virtual clock, and
+    # a resource sample is taken every sample_interval of virtual time.
+    def __init__(
+        self,
+        client,
+        clock: VirtualClock,
+        days: float,
+        sample_hours: float,
+        log_dir: str,
+    ):
+        super().__init__(client, clock, days)
+        self.log_dir = log_dir
+        self.sample_interval = sample_hours * 3600
+        self.next_sample = clock.now + self.sample_interval
+        self.cycle_times: List[float] = []
+        self.cycles = 0
+        self.samples: List[Sample] = []
+
+    async def _process_cycle(self):
+        started = time.perf_counter()
+        try:
+            await super()._process_cycle()
+        finally:
+            self.cycle_times.append(time.perf_counter() - started)
+            self.cycles += 1
+
+    async def _wait(self, delay: Optional[float]):
+        await super()._wait(delay)
+        while self.clock.now >= self.next_sample:
+            self.sample()
+            self.next_sample += self.sample_interval
+
+    def sample(self):
+        times = self.cycle_times
+        self.cycle_times = []
+        fds, sockets = open_fds()
+        self.samples.append(
+            Sample(
+                hours=(self.clock.now - self.started_at) / 3600,
+                rss_mib=rss_mib(),
+                objects=len(gc.get_objects()),
+                fds=fds,
+                sockets=sockets,
+                threads=threading.active_count(),
+                tasks=len(asyncio.all_tasks()),
+                log_handlers=log_handlers(),
+                log_mib=dir_mib(self.log_dir),
+                cycles=len(times),
+                cycle_p50_ms=percentile(times, 0.5) * 1000 if times else None,
+                cycle_p95_ms=percentile(times, 0.95) * 1000 if times else None,
+            )
+        )
+
+
+def slope(points: List[Tuple[float, float]]) -> float:
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def find_trends(
+    samples: List[Sample], warmup: float
+) -> Tuple[Dict[str, Dict[str, float]], List[str]]:
+    # Least-squares fit over the samples after the warm-up share of the run;
+    # caches, pools and interned objects fill up during the warm-up.
+    measured = samples[int(len(samples) * warmup) :]
+    trends, failures = {}, []
+    for metric, (relative, absolute) in LIMITS.items():
+        points = [
+            (sample.hours, getattr(sample, metric))
+            for sample in measured
+            if getattr(sample, metric) is not None
+        ]
+        if len(points) < 3:
+            continue
+        rate = slope(points)
+        span = points[-1][0] - points[0][0]
+        start = sum(y for _, y in points[:3]) / 3
+        growth = rate * span
+        limit = max(relative * abs(start), absolute)
+        trends[metric] = {
+            "start": start,
+            "end": points[-1][1],
+            "per_day": rate * 24,
+            "growth": growth,
+            "limit": limit,
+        }
+        if growth > limit:
+            failures.append(
+                f"{metric} grew by {growth:.2f} from {start:.2f} (limit {limit:.2f})"
+            )
+    return trends, failures
+
+
+async def _soak(args, log_dir: str) -> SoakResult:
+    clock = VirtualClock(time.time())
+    server_clock.clock = clock
+    game = MockGameServer(
+        clock=clock,
+        error_rate=args.error_rate,
+        error_status=503,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        seed=args.seed,
+    )
+    http = MockHttpServer(game).start()
+    retry = VirtualRetryPolicy(clock)
+    if args.client == "async":
+        client = AsyncGameApiClient(http.base_url, auth_data=AUTH_DATA, retry=retry)
+        await client.start()
+    else:
+        client = GameApiClient(http.base_url, auth_data=AUTH_DATA, retry=retry)
+
+    bot = SoakBot(client, clock, args.days, args.sample_hours, log_dir)
+    started = time.perf_counter()
+    try:
+        await bot.run_async()
+    finally:
+        if args.client == "async":
+            await client.close()
+        else:
+            client.client.close()
+        http.stop()
+    wall = time.perf_counter() - started
+
+    result = SoakResult(
+        days=args.days,
+        client=args.client,
+        cycles=bot.cycles,
+        requests=sum(game.hits.values()),
+        errors=sum(game.errors.values()),
+        wall_s=wall,
+        stopped_early=clock.now < bot.end,
+        samples=bot.samples,
+    )
+    result.trends, result.failures = find_trends(bot.samples, args.warmup)
+    if result.stopped_early:
+        result.failures.insert(
+            0, f"bot stopped after {(clock.now - bot.started_at) / 3600:.1f}h"
+        )
+    return result
+
+
+def print_result(result: SoakResult):
+    print(
+        f"{result.days:g} virtual days ({result.client} client) in "
+        f"{result.wall_s:.0f}s: {result.cycles} cycles, {result.requests} requests, "
+        f"{result.errors} injected errors"
+    )
+    print(f"{'metric':<14} {'start':>10} {'end':>10} {'per day':>10} {'limit':>10}")
+    for metric, trend in result.trends.items():
+        print(
+            f"{metric:<14} {trend['start']:10.2f} {trend['end']:10.2f} "
+            f"{trend['per_day']:10.3f} {trend['limit']:10.2f}"
+        )
+    for failure in result.failures:
+        print(f"FAIL {failure}")
+    if not result.failures:
+        print("PASS")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run GameBot for days of virtual time against a local mock "
+        "server and fail if memory, handles or cycle latency trend upward."
+    )
+    parser.add_argument("--days", type=float, default=14)
+    parser.add_argument("--client", choices=("sync", "async"), default="sync")
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--slow-rate", type=float, default=0.01)
+    parser.add_argument("--slow-latency", type=float, default=0.2)
+    parser.add_argument("--sample-hours", type=float, default=2)
+    parser.add_argument(
+        "--warmup", type=float, default=0.25, help="share of samples ignored"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    # Small segments and budget, so rotation, archiving and pruning all run
+    # many times over the soak.
+    parser.add_argument("--log-segment-kb", type=float, default=8)
+    parser.add_argument("--log-archive-kb", type=float, default=32)
+    parser.add_argument("--json", help="write samples and trends to this file")
+    args = parser.parse_args(argv)
+
+    # A second bot's control socket could replace the running bot's.
+    config.CONTROL_SOCKET = ""
+    config.CONTROL_PORT = 0
+
+    # Logging stays on, through the real queue, rotation and archiver, but
+    # into a scratch directory instead of the bot's own logs.
+    with tempfile.TemporaryDirectory(prefix="gamebot-soak-") as log_dir:
+        close_logger()
+        setup_logger(
+            log_dir=log_dir,
+            api_format=config.LOG_API_FORMAT,
+            api_body_limit=config.LOG_API_BODY_LIMIT,
+            api_sample_rate=config.LOG_API_SAMPLE_RATE,
+            segment_bytes=int(args.log_segment_kb * 1024),
+            archive_bytes=int(args.log_archive_kb * 1024),
+        )
+        try:
+            result = asyncio.run(_soak(args, log_dir))
+        finally:
+            close_logger()
+    print_result(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(asdict(result), f, indent=2)
+    return 1 if result.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
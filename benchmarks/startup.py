@@ -0,0 +1,98 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OWN_PACKAGES = ("main", "api", "bot", "core", "utils")
+# Third-party packages worth watching; any that stops being lazy shows up here.
+WATCHED = ("httpx", "dotenv", "orjson", "asyncio", "rich", "click", "pygments")
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    # "import time: self [us] | cumulative | imported package"
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def run_python(code: str, cwd: str, importtime: bool = False) -> Tuple[float, str]:
+    env = dict(os.environ, PYTHONPATH=ROOT, APP_HEADLESS="1")
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    started = time.perf_counter()
+    completed = subprocess.run(
+        command + ["-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - started, completed.stderr
+
+
+def measure_once(target: str, cwd: str) -> Dict[str, float]:
+    _, stderr = run_python(f"import {target}", cwd, importtime=True)
+    modules = parse_importtime(stderr)
+    own_us = sum(
+        self_us
+        for name, (self_us, _) in modules.items()
+        if name.split(".")[0] in OWN_PACKAGES
+    )
+    result = {
+        "import_ms": modules[target][1] / 1000,
+        "own_modules_ms": own_us / 1000,
+        "modules_loaded": float(len(modules)),
+    }
+    for package in WATCHED:
+        loaded = modules.get(package)
+        result[f"{package}_ms"] = loaded[1] / 1000 if loaded else 0.0
+    return result
+
+
+def bench_startup(runs: int = 5, target: str = "main") -> Dict[str, float]:
+    # Runs in a scratch directory so the logger's logs/ folder and any session
+    # file stay out of the checkout. Medians smooth out the disk cache.
+    with tempfile.TemporaryDirectory() as cwd:
+        interpreter: List[float] = []
+        wall: List[float] = []
+        samples: List[Dict[str, float]] = []
+        for _ in range(runs):
+            interpreter.append(run_python("pass", cwd)[0])
+            wall.append(run_python(f"import {target}", cwd)[0])
+            samples.append(measure_once(target, cwd))
+
+    result = {
+        "wall_ms": statistics.median(wall) * 1000,
+        "interpreter_ms": statistics.median(interpreter) * 1000,
+    }
+    for metric in samples[0]:
+        result[metric] = statistics.median(sample[metric] for sample in samples)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure cold-start import time with python -X importtime."
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", default="main", help="module to import")
+    args = parser.parse_args(argv)
+
+    for metric, value in bench_startup(args.runs, args.target).items():
+        print(f"{metric}: {value:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import stat
+import sys
+from contextlib import suppress
+from typing import Callable, Dict, Optional, Set
+
+from core.config import config
+from core.logger import logger
+
+COMMANDS = ("status", "run", "pause", "resume", "stop")
+
+
+class ControlServer:
+    # Line-based control plane: a client writes a command name per line and
+    # gets one JSON object back per line. It listens on a Unix socket that
+    # only the owner can open, or on 127.0.0.1 when a port is given (or the
+    # platform has no Unix sockets).
+    def __init__(self, handlers: Dict[str, Callable[[], dict]]):
+        self.handlers = handlers
+        self.path: Optional[str] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self, path: str = "", port: int = 0) -> bool:
+        if port:
+            self._server = await asyncio.start_server(self._serve, "127.0.0.1", port)
+            logger.info("Control server listening on 127.0.0.1:%d", port)
+            return True
+        if not path or not hasattr(asyncio, "start_unix_server"):
+            return False
+        with suppress(FileNotFoundError):
+            # Left behind by a bot that was killed; anything else is not ours.
+            if stat.S_ISSOCK(os.lstat(path).st_mode):
+                os.unlink(path)
+        # Created owner-only: a chmod after the bind would leave a window in
+        # which any local user could connect.
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._serve, path)
+        finally:
+            os.umask(umask)
+        os.chmod(path, 0o600)
+        self.path = path
+        logger.info("Control server listening on %s", path)
+        return True
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+        if self.path:
+            with suppress(FileNotFoundError):
+                os.unlink(self.path)
+            self.path = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip().lower()
+                handler = self.handlers.get(command)
+                if handler is None:
+                    reply = {
+                        "ok": False,
+                        "error": f"Unknown command: {command!r}",
+                        "commands": sorted(self.handlers),
+                    }
+                else:
+                    reply = {"ok": True, **handler()}
+                writer.write(json.dumps(reply, default=str).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logger.error("Control command failed: %s", e)
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+def send_command(
+    command: str, path: str = "", port: int = 0, timeout: float = 5
+) -> dict:
+    if port:
+        sock = socket.create_connection(("127.0.0.1", port), timeout)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(path)
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(f"{command}\n".encode())
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Control a running GameBot.")
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--socket", default=config.CONTROL_SOCKET)
+    parser.add_argument("--port", type=int, default=config.CONTROL_PORT)
+    args = parser.parse_args(argv)
+
+    try:
+        reply = send_command(args.command, args.socket, args.port)
+    except OSError as e:
+        print(f"Cannot reach the bot: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(reply, indent=2))
+    return 0 if reply.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import logging
+import re
+from typing import Deque, Optional, Tuple
+
+from core.logger import logger
+from core.model import UserState
+
+MARKUP = re.compile(r"\[/?[a-z_ ]+\]")
+
+LOG_LEVELS = {
+    "info": logging.INFO,
+    "success": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+LogEntry = Tuple[str, str, str]
+
+
+class Dashboard:
+    def __enter__(self) -> "Dashboard":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def log(self, message: str, level: str = "info"):
+        pass
+
+    def render(
+        self,
+        state: Optional[UserState],
+        status: str,
+        logs: Deque[LogEntry],
+        force: bool = False,
+    ):
+        pass
+
+    def alert(self, message: str, panel: bool = False):
+        pass
+
+
+class HeadlessDashboard(Dashboard):
+    # Daemonized runs: activity goes to the log file and rich is never imported.
+    def __init__(self):
+        self._status = None
+
+    def log(self, message: str, level: str = "info"):
+        logger.log(LOG_LEVELS.get(level, logging.INFO), message)
+
+    def render(
+        self,
+        state: Optional[UserState],
+        status: str,
+        logs: Deque[LogEntry],
+        force: bool = False,
+    ):
+        if status != self._status:
+            self._status = status
+            logger.info("Status: %s", MARKUP.sub("", status))
+
+    def alert(self, message: str, panel: bool = False):
+        # Alerts repeat a message already passed to log(); one record is enough.
+        pass
+
+
+def create_dashboard(headless: bool = False, refresh_interval: float = 1) -> Dashboard:
+    if headless:
+        return HeadlessDashboard()
+
+    from bot.rich_dashboard import RichDashboard
+
+    return RichDashboard(refresh_interval)
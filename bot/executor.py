@@ -0,0 +1,116 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Set
+
+from api.retry import CircuitOpenError
+from core.profiling import profiler
+from core.ratelimit import TokenBucket
+
+
+class ActionSkipped(Exception):
+    # Raised by an action that, on a fresher look, turned out not to be due.
+    pass
+
+
+@dataclass(frozen=True)
+class Action:
+    name: str
+    should_execute: Callable[[float], bool]
+    execute: Callable[[], Awaitable[None]]
+
+
+@dataclass
+class CycleReport:
+    succeeded: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    waited: float = 0.0
+
+    @property
+    def attempted(self) -> int:
+        return len(self.succeeded) + len(self.failed)
+
+    @property
+    def actions_per_minute(self) -> float:
+        if not self.elapsed:
+            return 0.0
+        return self.attempted * 60 / self.elapsed
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.succeeded)}/{self.attempted} actions in {self.elapsed:.1f}s "
+            f"({self.waited:.1f}s rate-limited, {self.actions_per_minute:.1f}/min)"
+        )
+
+
+class ActionExecutor:
+    # Runs due actions in order, pacing them through a token bucket instead of
+    # fixed sleeps. Follow-up work that only needs a delay (finishing the
+    # onclick task) is scheduled with call_later so it never blocks the cycle.
+    def __init__(
+        self,
+        limiter: TokenBucket,
+        on_start: Callable[[str], None],
+        on_success: Callable[[str], None],
+        on_error: Callable[[str, Exception], None],
+    ):
+        self.limiter = limiter
+        self.on_start = on_start
+        self.on_success = on_success
+        self.on_error = on_error
+        # Set while the bot is paused or stopping; the rest of the cycle is
+        # dropped, including an action that was waiting for a token.
+        self._halt = asyncio.Event()
+        self._pending: Set[asyncio.Task] = set()
+
+    @property
+    def halted(self) -> bool:
+        return self._halt.is_set()
+
+    @halted.setter
+    def halted(self, value: bool):
+        if value:
+            self._halt.set()
+        else:
+            self._halt.clear()
+
+    async def run(self, actions: List[Action], now: float) -> CycleReport:
+        report = CycleReport()
+        started = time.perf_counter()
+        for action in actions:
+            if self.halted or not action.should_execute(now):
+                continue
+            with profiler.span("rate limit", "sleep"):
+                report.waited += await self.limiter.acquire(self._halt)
+            if self.halted:
+                break
+            self.on_start(action.name)
+            try:
+                with profiler.span(action.name, "action"):
+                    await action.execute()
+            except (CircuitOpenError, ActionSkipped) as e:
+                report.skipped.append(action.name)
+                self.on_error(action.name, e)
+            except Exception as e:
+                report.failed.append(action.name)
+                self.on_error(action.name, e)
+            else:
+                report.succeeded.append(action.name)
+                self.on_success(action.name)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def call_later(self, delay: float, callback: Callable[[], None]):
+        async def run_later():
+            await asyncio.sleep(delay)
+            callback()
+
+        task = asyncio.create_task(run_later())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def cancel_pending(self):
+        for task in list(self._pending):
+            task.cancel()
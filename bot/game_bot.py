@@ -1,126 +1,148 @@
+import asyncio
+import signal
 import time
-from datetime import datetime, timedelta
-from time import sleep
-from typing import Callable, List, Tuple
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Optional
 from collections import deque
 
-from rich.console import Console
-from rich.live import Live
-from rich.panel import Panel
-from rich.table import Table
-from rich.theme import Theme
-
-from core.model import UserState
-
-custom_theme = Theme(
-    {
-        "info": "cyan",
-        "success": "green",
-        "warning": "yellow",
-        "error": "red bold",
-        "title": "blue bold",
-        "value": "bright_white",
-        "log": "dim white",
-        "timestamp": "bright_black",
-    }
+from api.retry import CircuitOpenError
+from bot.control import ControlServer
+from bot.dashboard import MARKUP, Dashboard, create_dashboard
+from bot.executor import Action, ActionExecutor, ActionSkipped, CycleReport
+from bot.scheduler import Scheduler
+from bot.state_cache import StateCache
+from core import metrics
+from core.clock import server_clock
+from core.config import ConfigError, config
+from core.history import history
+from core.model import GameRules, User, UserState, parse_timestamp
+from core.profiling import profiler
+from core.ratelimit import TokenBucket
+
+
+# Order in which due actions run each cycle, by UserState deadline key.
+ACTION_ORDER = (
+    "daily",
+    "claim",
+    "fuel",
+    "shield",
+    "shield_immunity",
+    "task",
+    "roulette",
 )
 
-console = Console(theme=custom_theme)
-
 
 class GameBot:
-    def __init__(self, api_client):
+    def __init__(self, api_client, dashboard: Optional[Dashboard] = None):
         self.client = api_client
+        self.session = api_client.session
+        self.dashboard = dashboard or create_dashboard(
+            config.HEADLESS, config.DASHBOARD_REFRESH
+        )
         self.running = False
-        self.retry_delays = [5, 10, 30, 60]
+        self.paused = False
+        # Every wait in the run loop is on this event, so control commands and
+        # signals take effect at once instead of after the current sleep.
+        self._wakeup = asyncio.Event()
+        self.retry_delays = config.CYCLE_RETRY_DELAYS
+        self.failed_cycles = 0
         self.status_message = "Waiting..."
-        self.user_data = {}
+        self.cache = StateCache(
+            self._fetch_user,
+            lambda: self._call(self.client.get_tasks),
+            user_ttl=config.USER_TTL,
+            tasks_ttl=config.TASKS_TTL,
+        )
+        self.scheduler = Scheduler(
+            config.MAX_SLEEP,
+            config.MIN_SLEEP,
+            config.DEADLINE_MARGIN,
+            config.RETRY_AFTER,
+        )
+        self.rules = self._game_rules()
+        self.action_order = ACTION_ORDER
+        self.executor = ActionExecutor(
+            TokenBucket(config.ACTION_RATE, config.ACTION_BURST),
+            self._on_action_start,
+            self._on_action_success,
+            self._on_action_error,
+        )
+        self.last_report: Optional[CycleReport] = None
+        self.state: Optional[UserState] = None
+        self._evaluated_at = server_clock.now()
+        self._action_started = (0.0, None)
         self.logs = deque(maxlen=10)  # last 10 logs
         self._add_log("System initialized", "info")
+        self._restore_user()
+        self.control = ControlServer(
+            {
+                "status": self.status,
+                "run": self.run_now,
+                "pause": self.pause,
+                "resume": self.resume,
+                "stop": self.stop,
+            }
+        )
+
+    def _restore_user(self):
+        # The last saved user counts as fetched when it was saved, so a quick
+        # restart skips the startup get_user until USER_TTL runs out.
+        if self.session is None or not self.session.data.user:
+            return
+        try:
+            user = User.from_response(self.session.data.user)
+        except (KeyError, TypeError, ValueError):
+            return
+        self.cache.put_user(user, fetched_at=self.session.data.user_saved_at)
+        self._observe_user(user)
 
-    def _add_log(self, message: str, level: str = "info"):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.logs.append((timestamp, message, level))
-
-    def _generate_status_table(self) -> Table:
-        main_table = Table(show_header=False, box=None, padding=(0, 2))
+    def _observe_user(self, user: User):
+        metrics.balance.set(user.balance)
+        metrics.fuel_level.set(user.level_fuel)
+        metrics.shield.set(user.shield)
 
-        if self.user_data:
-            main_table.add_row(
-                "[info]💰 Balance:[/info]",
-                f"[value]{self.user_data.get('balance', 0):.2f}[/value]",
-            )
-            shield_status = (
-                "Active" if self.user_data.get("shield_active") else "Not Active"
-            )
-            main_table.add_row(
-                "[info]🛡️ Shield:[/info]",
-                f"[value]{self.user_data.get('shield', 0)} ({shield_status})[/value]",
-            )
+    def _record_user(self, user: User):
+        self._observe_user(user)
+        history.record_state(user)
+        if self.session is not None:
+            self.session.update(user=asdict(user), user_saved_at=time.time())
 
-        times = {
-            "⏰ Last Claim": self.user_data.get("claimed_last"),
-            "🔄 Next Daily": self.user_data.get("daily_next_at"),
-            "⛽ Last refueling": self.user_data.get("fuel_last_at"),
-            "🛡 Shield immunity up to": self.user_data.get("shield_immunity_at"),
-            "🛡 Shield is active until": self.user_data.get("shield_free_after_at"),
-            "🎰 Spin after": self.user_data.get("spin_after_at"),
-        }
+    async def _fetch_user(self) -> User:
+        user = await self._call(self.client.get_user)
+        self._record_user(user)
+        return user
 
-        for label, time_str in times.items():
-            if time_str:
-                try:
-                    dt = datetime.fromisoformat(time_str.replace("Z", "")) + timedelta(
-                        hours=1
-                    )
-                    formatted_time = dt.strftime("%H:%M:%S %d.%m.%Y")
-                    time_left = (dt - datetime.now()).total_seconds()
-                    if time_left > 0:
-                        hours = int(time_left // 3600)
-                        minutes = int((time_left % 3600) // 60)
-                        seconds = int(time_left % 60)
-                        time_left_str = (
-                            f" ({hours:02d}:{minutes:02d}:{seconds:02d} left)"
-                        )
-                    else:
-                        time_left_str = " (Ready!)"
-                    main_table.add_row(
-                        f"[info]{label}:[/info]",
-                        f"[value]{formatted_time}{time_left_str}[/value]",
-                    )
-                except:
-                    main_table.add_row(
-                        f"[info]{label}:[/info]", "[value]No data[/value]"
-                    )
+    def _add_log(self, message: str, level: str = "info"):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.logs.append((timestamp, message, level))
+        self.dashboard.log(message, level)
 
-        main_table.add_row("")
-        main_table.add_row(f"[info]Status:[/info] {self.status_message}")
+    def _render(self, force: bool = False):
+        with profiler.span("render", "dashboard"):
+            self.dashboard.render(self.state, self.status_message, self.logs, force)
 
-        if self.logs:
-            main_table.add_row("")
-            main_table.add_row("[info]Recent Activity:[/info]")
-            for timestamp, message, level in reversed(self.logs):
-                main_table.add_row(
-                    f"[timestamp]{timestamp}[/timestamp]",
-                    f"[{level}]{message}[/{level}]",
-                )
+    async def _call(self, method: Callable, *args):
+        # Blocking clients run in a worker thread so the loop stays responsive.
+        if self.client.is_async:
+            return await method(*args)
+        return await asyncio.to_thread(profiler.threaded(method), *args)
 
-        return Panel(main_table, title="[title]🎮 GameBot Status[/title]", expand=False)
+    async def _refresh_dashboard(self, interval: float = 1):
+        while True:
+            self._render()
+            await asyncio.sleep(interval)
 
     def run(self):
-        try:
-            user_data = self.client.get_user()
-            if not user_data or "user" not in user_data:
-                self._add_log("Failed to initialize user data", "error")
-                return
+        asyncio.run(self.run_async())
 
-            self.user_data = user_data["user"]
+    async def run_async(self):
+        try:
+            user = await self.cache.get_user()
 
-            if self.user_data["tech_work"]:
+            if user.tech_work:
                 self._add_log("Tech work is active. Bot is disabled", "error")
-                console.print(
-                    Panel("Tech work is active. Bot is disabled", style="error")
-                )
+                self.dashboard.alert("Tech work is active. Bot is disabled", panel=True)
                 return
 
             self.running = True
@@ -130,108 +152,355 @@ class GameBot:
             self._add_log(f"Initialization error: {str(e)}", "error")
             return
 
-        with Live(self._generate_status_table(), refresh_per_second=1) as live:
-            while self.running:
-                try:
-                    self._process_cycle()
+        with self.dashboard:
+            refresher = asyncio.create_task(self._refresh_dashboard())
+            watcher = asyncio.create_task(self._watch_config())
+            signals = [
+                self._add_signal_handler("SIGUSR1", self._toggle_profiling),
+                self._add_signal_handler("SIGTERM", self.stop),
+                self._add_signal_handler("SIGINT", self.stop),
+            ]
+            try:
+                await self.control.start(config.CONTROL_SOCKET, config.CONTROL_PORT)
+            except OSError as e:
+                self._add_log(f"Control server unavailable: {e}", "warning")
+            try:
+                await self._run_cycles()
+            finally:
+                for signum in filter(None, signals):
+                    asyncio.get_running_loop().remove_signal_handler(signum)
+                await self.control.stop()
+                refresher.cancel()
+                watcher.cancel()
+                self.executor.cancel_pending()
+                self._render(force=True)
+
+    @staticmethod
+    def _game_rules() -> GameRules:
+        return GameRules(
+            claim_cooldown=config.CLAIM_COOLDOWN,
+            immunity_cooldown=config.IMMUNITY_COOLDOWN,
+            shield_min_balance=config.SHIELD_MIN_BALANCE,
+            immunity_min_balance=config.IMMUNITY_MIN_BALANCE,
+            fuel_delays=config.FUEL_DELAYS,
+        )
+
+    async def _watch_config(self):
+        while True:
+            await asyncio.sleep(config.CONFIG_POLL)
+            if not config.changed_on_disk():
+                continue
+            try:
+                applied, pending = config.reload()
+            except ConfigError as e:
+                self._add_log(f"Configuration not reloaded: {e}", "error")
+                continue
+            if pending:
+                self._add_log(f"Restart to apply: {', '.join(pending)}", "warning")
+            if applied:
+                self._apply_config()
+                changes = ", ".join(
+                    f"{name} {old} -> {new}" for name, (old, new) in applied.items()
+                )
+                self._add_log(f"Configuration reloaded: {changes}", "info")
+
+    def _apply_config(self):
+        self.client.apply_config()
+        self.cache.set_ttls(config.USER_TTL, config.TASKS_TTL)
+        self.executor.limiter.configure(config.ACTION_RATE, config.ACTION_BURST)
+        self.scheduler.max_sleep = config.MAX_SLEEP
+        self.scheduler.min_sleep = config.MIN_SLEEP
+        self.scheduler.margin = config.DEADLINE_MARGIN
+        self.scheduler.retry_after = config.RETRY_AFTER
+        self.retry_delays = config.CYCLE_RETRY_DELAYS
+        self.rules = self._game_rules()
+        if self.cache.user is not None:
+            self.state = UserState.from_response(
+                self.cache.user, self.cache.tasks, self.rules
+            )
+            self.scheduler.rebuild(self.state, self._evaluated_at)
+        # Ends the current sleep, which was planned with the old values; the
+        # next cycle works from the cache unless a TTL ran out.
+        self.wake()
+
+    def _add_signal_handler(self, name: str, callback: Callable):
+        # Signals are POSIX-only and need the main thread; elsewhere the
+        # handler is simply not installed.
+        signum = getattr(signal, name, None)
+        if signum is None:
+            return None
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, callback)
+        except (NotImplementedError, RuntimeError, ValueError):
+            return None
+        return signum
+
+    def _toggle_profiling(self):
+        profiler.toggle(config.PROFILE or "trace", config.PROFILE_DIR)
+        state = "enabled" if profiler.enabled else "disabled"
+        self._add_log(f"Profiling {state}", "warning")
+
+    async def _wait(self, delay: Optional[float]):
+        # Sleeps for delay seconds (None: until woken); returns early on wake().
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def status(self) -> dict:
+        now = server_clock.now()
+        user = self.cache.user
+        return {
+            "running": self.running,
+            "paused": self.paused,
+            "status": MARKUP.sub("", self.status_message),
+            "failed_cycles": self.failed_cycles,
+            "user": asdict(user) if user else None,
+            "schedule": [
+                {"action": action, "due_at": due_at, "due_in": max(0.0, due_at - now)}
+                for due_at, action in self.scheduler.entries()
+            ],
+            "last_cycle": asdict(self.last_report) if self.last_report else None,
+            "clock_offset": server_clock.offset,
+        }
+
+    def run_now(self) -> dict:
+        # Refetch instead of trusting the cache, in case something changed
+        # outside the bot.
+        self.cache.invalidate_user()
+        self.cache.invalidate_tasks()
+        self._add_log("Cycle requested", "info")
+        self.wake()
+        return self.status()
+
+    def pause(self) -> dict:
+        if not self.paused:
+            self.paused = True
+            self.executor.halted = True
+            self._add_log("Paused", "warning")
+            self.wake()
+        return self.status()
+
+    def resume(self) -> dict:
+        if self.paused:
+            self.paused = False
+            self.executor.halted = False
+            self._add_log("Resumed", "info")
+            self.wake()
+        return self.status()
+
+    def stop(self) -> dict:
+        # The request in flight, if any, finishes; everything after it and
+        # every wait, including retry backoff inside the client, is cut short.
+        if self.running:
+            self.running = False
+            self.executor.halted = True
+            self.client.retry.cancel()
+            self._add_log("Stopping", "warning")
+            self.wake()
+        return self.status()
+
+    async def _run_cycles(self):
+        while self.running:
+            if self.paused:
+                self.status_message = "Paused"
+                self._render()
+                await self._wait(None)
+                continue
+            try:
+                await self._process_cycle()
+                self.failed_cycles = 0
+                delay, action = self.scheduler.next_wakeup(server_clock.now())
+                if action:
+                    self.status_message = (
+                        f"Waiting {int(delay)}s for next action: {action}..."
+                    )
+                else:
                     self.status_message = "Waiting for next cycle..."
-                    live.update(self._generate_status_table())
-                    time.sleep(300)
-                except Exception as e:
-                    self._handle_error(e)
-                    live.update(self._generate_status_table())
+                self._render()
+                started = time.monotonic()
+                with profiler.span("sleep", "sleep", action=action):
+                    await self._wait(delay)
+                metrics.sleep_seconds.inc("schedule", amount=time.monotonic() - started)
+            except Exception as e:
+                await self._handle_error(e)
+                self._render()
 
-    def _process_cycle(self):
+    async def _process_cycle(self):
         try:
-            task_data = self.client.get_tasks()
-            state = UserState.from_response(self.user_data, task_data["listCompleted"])
-            current_time = datetime.now()
-            self._process_actions(state, current_time)
+            with profiler.cycle():
+                user = await self.cache.get_user()
+                tasks = await self.cache.get_tasks()
+                self.state = UserState.from_response(user, tasks, self.rules)
+                # Deadlines come from server timestamps, so "now" is read
+                # on the server's clock too.
+                now = server_clock.now()
+                self._evaluated_at = now
+                self.scheduler.rebuild(self.state, now)
+                await self._process_actions(self.state, now)
 
         except Exception as e:
             self.status_message = f"[error]Error: {str(e)}[/error]"
             self._add_log(f"Error in process cycle: {str(e)}", "error")
             raise
 
-    def _process_actions(self, state: UserState, current_time: datetime):
-        actions: List[Tuple[Callable, Callable, str]] = [
-            (state.should_claim_daily, self._daily, "daily reward"),
-            (state.should_claim, self._claim, "balance"),
-            (state.should_get_fuel, self._get_fuel, "fuel"),
-            (state.should_get_shield, self._get_shield, "shield"),
-            (
+    async def _process_actions(self, state: UserState, now: float):
+        available = {
+            "daily": Action("daily reward", state.should_claim_daily, self._daily),
+            "claim": Action("balance", state.should_claim, self._claim),
+            "fuel": Action("fuel", state.should_get_fuel, self._get_fuel),
+            "shield": Action("shield", state.should_get_shield, self._get_shield),
+            "shield_immunity": Action(
+                "shield immunity",
                 state.should_get_shield_immunity,
                 self._get_shield_immunity,
-                "shield immunity",
             ),
-            (state.should_get_onclick_task, self._get_task_adv, "task"),
-            (state.should_get_roulette, self._get_roulette, "roulette"),
-        ]
-
-        for should_execute, execute, action_name in actions:
-            try:
-                if should_execute(current_time):
-                    self.status_message = f"Getting {action_name}..."
-                    self._add_log(f"Attempting to get {action_name}", "info")
-                    execute()
-                    self.status_message = f"Completed successfully: {action_name}."
-                    self._add_log(f"Successfully obtained {action_name}", "success")
-                    sleep(5)
-            except Exception as e:
-                error_message = f"Error while executing {action_name}: {e}"
-                self._add_log(error_message, "error")
-                console.print(f"[error]✗ {error_message}[/error]")
-
-    def _handle_error(self, error: Exception):
-        for delay in self.retry_delays:
-            error_message = f"Error: {str(error)}. Retrying in {delay} seconds..."
-            self.status_message = f"[error]{error_message}[/error]"
-            self._add_log(error_message, "warning")
-            time.sleep(delay)
-            try:
-                return
-            except Exception as e:
-                self._add_log(f"Retry failed: {str(e)}", "error")
-
-        final_message = "Maximum number of attempts reached. Bot stops."
-        self.status_message = f"[error]{final_message}[/error]"
-        self._add_log(final_message, "error")
-        console.print(Panel(self.status_message, style="error"))
-        self.running = False
-
-    def _claim(self):
-        response = self.client.claim()
-        self.user_data = response["user"]
+            "task": Action("task", state.should_get_onclick_task, self._get_task_adv),
+            "roulette": Action(
+                "roulette", state.should_get_roulette, self._get_roulette
+            ),
+        }
+        actions = [available[key] for key in self.action_order]
+
+        # An action only counts as due DEADLINE_MARGIN after its deadline,
+        # the same slack the scheduler wakes with. Deadlines are checked on
+        # the estimated server clock, and without the slack an action sharing
+        # a wakeup would fire by however much that estimate is off.
+        report = await self.executor.run(actions, now - self.scheduler.margin)
+        self.last_report = report
+        self._record_report(report)
+        if report.attempted:
+            self._add_log(f"Cycle finished: {report.summary()}", "info")
+
+    def _record_report(self, report: CycleReport):
+        for result, names in (
+            ("success", report.succeeded),
+            ("failure", report.failed),
+            ("skipped", report.skipped),
+        ):
+            for name in names:
+                metrics.actions_total.inc(name, result)
+        metrics.cycle_duration.observe(report.elapsed)
+        metrics.sleep_seconds.inc("rate_limit", amount=report.waited)
+
+    def _on_action_start(self, action_name: str):
+        self.status_message = f"Getting {action_name}..."
+        self._add_log(f"Attempting to get {action_name}", "info")
+        user = self.cache.user
+        self._action_started = (time.perf_counter(), user.balance if user else None)
+
+    def _record_action(self, action_name: str, result: str, error: str = None):
+        started, balance_before = self._action_started
+        user = self.cache.user
+        reward = None
+        if result == "success" and user and balance_before is not None:
+            reward = user.balance - balance_before
+        history.record_action(
+            action_name, result, time.perf_counter() - started, user, reward, error
+        )
+
+    def _on_action_success(self, action_name: str):
+        self.status_message = f"Completed successfully: {action_name}."
+        self._add_log(f"Successfully obtained {action_name}", "success")
+        self._record_action(action_name, "success")
+
+    def _on_action_error(self, action_name: str, error: Exception):
+        if isinstance(error, (CircuitOpenError, ActionSkipped)):
+            self._record_action(action_name, "skipped", str(error))
+            self._add_log(f"Skipped {action_name}: {error}", "warning")
+            return
+        self._record_action(action_name, "failure", str(error))
+        error_message = f"Error while executing {action_name}: {error}"
+        self._add_log(error_message, "error")
+        self.dashboard.alert(error_message)
+
+    async def _handle_error(self, error: Exception):
+        # Called once per failed cycle; the run loop then re-runs the cycle.
+        # Consecutive failures walk through retry_delays and then keep
+        # retrying at the last one, so the bot recovers once the server does.
+        if not self.running:
+            # Stopping cut the cycle short; that is not a failure.
+            return
+        if isinstance(error, CircuitOpenError):
+            # The breaker knows when the endpoint may be tried again; waiting
+            # for it is not a failed cycle.
+            delay = max(error.retry_in, self.scheduler.min_sleep)
+            self.status_message = f"[warning]{error}[/warning]"
+            self._add_log(f"{error}. Waiting {delay:.0f} seconds...", "warning")
+            await self._wait(delay)
+            return
+        delay = self.retry_delays[min(self.failed_cycles, len(self.retry_delays) - 1)]
+        self.failed_cycles += 1
+        error_message = f"Error: {str(error)}. Retrying in {delay} seconds..."
+        self.status_message = f"[error]{error_message}[/error]"
+        self._add_log(error_message, "warning")
+        await self._wait(delay)
+
+    def _update_user(self, user: User):
+        self.cache.put_user(user)
+        self._record_user(user)
+        self.state = UserState.from_response(user, self.cache.tasks, self.rules)
+        self.scheduler.rebuild(self.state, self._evaluated_at)
+
+    @staticmethod
+    def _observe_stamp(value: Optional[str], sent_at: float):
+        # Action responses carry the server's own microsecond stamp of the
+        # call, a far sharper clock sample than the whole-second Date header.
+        server_time = parse_timestamp(value)
+        if server_time is not None:
+            server_clock.observe(server_time, sent_at, server_clock.clock())
+
+    async def _claim(self):
+        sent_at = server_clock.clock()
+        user = await self._call(self.client.claim)
+        self._observe_stamp(user.claimed_last, sent_at)
+        self._update_user(user)
         self._add_log("Claimed balance successfully", "success")
 
-    def _daily(self):
-        response = self.client.get_daily()
-        self.user_data = response["user"]
+    async def _daily(self):
+        user = await self._call(self.client.get_daily)
+        self._update_user(user)
         self._add_log("Collected daily reward", "success")
 
-    def _get_fuel(self):
-        response = self.client.get_fuel()
-        self.user_data = response["user"]
+    async def _get_fuel(self):
+        sent_at = server_clock.clock()
+        user = await self._call(self.client.get_fuel)
+        self._observe_stamp(user.fuel_last_at, sent_at)
+        self._update_user(user)
         self._add_log("Refueled successfully", "success")
 
-    def _get_shield(self):
-        response = self.client.get_shield()
-        self.user_data = response["user"]
+    async def _get_shield(self):
+        if self.cache.user is not None and self.cache.user.shield_active:
+            # The deadline is the end of a shield seen on a cached user, which
+            # may be USER_TTL old; confirm it ran out before paying again.
+            self._update_user(await self._call(self.client.get_user))
+            now = server_clock.now() - self.scheduler.margin
+            if not self.state.should_get_shield(now):
+                raise ActionSkipped("Shield is still active")
+        user = await self._call(self.client.get_shield)
+        self._update_user(user)
         self._add_log("Shield obtained", "success")
 
-    def _get_shield_immunity(self):
-        response = self.client.get_shield_immunity()
-        self.user_data = response["user"]
+    async def _get_shield_immunity(self):
+        user = await self._call(self.client.get_shield_immunity)
+        self._update_user(user)
         self._add_log("Shield immunity obtained", "success")
 
-    def _get_task_adv(self):
-        response = self.client.get_onclick_task()
-        self.user_data = response["user"]
+    async def _get_task_adv(self):
+        user = await self._call(self.client.get_onclick_task)
+        self._update_user(user)
+        self.cache.invalidate_tasks()
         self._add_log("Started task advertisement", "info")
-        sleep(10)
-        self._add_log("Completed task advertisement", "success")
-
-    def _get_roulette(self):
-        response = self.client.get_roulette()
-        self.user_data = response["user"]
+        self.executor.call_later(
+            config.TASK_AD_SECONDS,
+            lambda: self._add_log("Completed task advertisement", "success"),
+        )
+
+    async def _get_roulette(self):
+        user = await self._call(self.client.get_roulette)
+        self._update_user(user)
         self._add_log("Spin completed", "success")
@@ -0,0 +1,176 @@
+import time
+from datetime import datetime
+from typing import Deque, List, Optional, Tuple
+
+from rich.console import Console
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from rich.theme import Theme
+
+from bot.dashboard import Dashboard, LogEntry
+from core.clock import server_clock
+from core.model import UserState
+
+custom_theme = Theme(
+    {
+        "info": "cyan",
+        "success": "green",
+        "warning": "yellow",
+        "error": "red bold",
+        "title": "blue bold",
+        "value": "bright_white",
+        "log": "dim white",
+        "timestamp": "bright_black",
+    }
+)
+
+
+def format_time_left(time_left: Optional[float]) -> str:
+    if time_left is None:
+        return ""
+    if time_left <= 0:
+        return " (Ready!)"
+    hours = int(time_left // 3600)
+    minutes = int((time_left % 3600) // 60)
+    seconds = int(time_left % 60)
+    return f" ({hours:02d}:{minutes:02d}:{seconds:02d} left)"
+
+
+class RichDashboard(Dashboard):
+    # Rows are cached per source: state rows are rebuilt only when a new
+    # snapshot arrives, log rows only when a new entry is appended, and the
+    # countdown column is the only thing recomputed on a plain tick.
+    def __init__(self, refresh_interval: float = 1):
+        self.console = Console(theme=custom_theme)
+        self.refresh_interval = refresh_interval
+        self._live: Optional[Live] = None
+        self._rendered_at = 0.0
+        self._second = None
+
+        self._state: Optional[UserState] = None
+        self._state_rows: List[Tuple[str, str]] = []
+        self._deadline_rows: List[Tuple[str, str, str]] = []
+        self._countdowns: List[str] = []
+
+        self._status: Optional[str] = None
+        self._last_log: Optional[LogEntry] = None
+        self._log_rows: List[Tuple[str, str]] = []
+
+    def __enter__(self) -> "RichDashboard":
+        self._live = Live(console=self.console, auto_refresh=False)
+        self._live.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._live.__exit__(exc_type, exc, tb)
+        self._live = None
+
+    def _set_state(self, state: Optional[UserState]):
+        self._state = state
+        self._state_rows = []
+        self._deadline_rows = []
+        self._second = None
+        if not state:
+            return
+
+        shield_status = "Active" if state.shield_active else "Not Active"
+        self._state_rows = [
+            ("[info]💰 Balance:[/info]", f"[value]{state.balance:.2f}[/value]"),
+            (
+                "[info]🛡️ Shield:[/info]",
+                f"[value]{state.shield} ({shield_status})[/value]",
+            ),
+        ]
+
+        # Each row counts down to the deadline of the action it belongs to.
+        times = {
+            "⏰ Last Claim": (state.claimed_last_at, "claim"),
+            "🔄 Next Daily": (state.daily_next_at, "daily"),
+            "⛽ Last refueling": (state.fuel_last_at, "fuel"),
+            "🛡 Shield immunity up to": (state.shield_immunity_at, "shield_immunity"),
+            "🛡 Shield is active until": (state.shield_ended_at, "shield"),
+            "🎰 Spin after": (state.spin_after_at, "roulette"),
+        }
+        for label, (timestamp, action) in times.items():
+            if timestamp is None:
+                continue
+            # Shown in local time, corrected for the server's clock offset.
+            formatted_time = datetime.fromtimestamp(
+                server_clock.to_local(timestamp)
+            ).strftime("%H:%M:%S %d.%m.%Y")
+            self._deadline_rows.append(
+                (f"[info]{label}:[/info]", action, formatted_time)
+            )
+
+    def _set_logs(self, logs: Deque[LogEntry]):
+        self._last_log = logs[-1] if logs else None
+        self._log_rows = [
+            (f"[timestamp]{timestamp}[/timestamp]", f"[{level}]{message}[/{level}]")
+            for timestamp, message, level in reversed(logs)
+        ]
+
+    def _build(self) -> Panel:
+        main_table = Table(show_header=False, box=None, padding=(0, 2))
+
+        for label, value in self._state_rows:
+            main_table.add_row(label, value)
+        for (label, _, formatted_time), countdown in zip(
+            self._deadline_rows, self._countdowns
+        ):
+            main_table.add_row(label, f"[value]{formatted_time}{countdown}[/value]")
+
+        main_table.add_row("")
+        main_table.add_row(f"[info]Status:[/info] {self._status}")
+
+        if self._log_rows:
+            main_table.add_row("")
+            main_table.add_row("[info]Recent Activity:[/info]")
+            for timestamp, message in self._log_rows:
+                main_table.add_row(timestamp, message)
+
+        return Panel(main_table, title="[title]🎮 GameBot Status[/title]", expand=False)
+
+    def render(
+        self,
+        state: Optional[UserState],
+        status: str,
+        logs: Deque[LogEntry],
+        force: bool = False,
+    ):
+        now = time.time()
+        if not force and now - self._rendered_at < self.refresh_interval:
+            return
+
+        changed = force
+        if state is not self._state:
+            self._set_state(state)
+            changed = True
+        if status != self._status:
+            self._status = status
+            changed = True
+        if (logs[-1] if logs else None) is not self._last_log:
+            self._set_logs(logs)
+            changed = True
+
+        second = int(now)
+        if second != self._second:
+            self._second = second
+            server_now = server_clock.now()
+            countdowns = [
+                format_time_left(self._state.seconds_until(action, server_now))
+                for _, action, _ in self._deadline_rows
+            ]
+            if countdowns != self._countdowns:
+                self._countdowns = countdowns
+                changed = True
+
+        if changed and self._live is not None:
+            self._live.update(self._build(), refresh=True)
+            self._rendered_at = now
+
+    def alert(self, message: str, panel: bool = False):
+        if panel:
+            self.console.print(Panel(message, style="error"))
+        else:
+            self.console.print(f"[error]✗ {message}[/error]")
@@ -0,0 +1,50 @@
+import heapq
+from typing import List, Optional, Tuple
+
+from core.model import UserState, seconds_until
+
+
+class Scheduler:
+    def __init__(
+        self,
+        max_sleep: float = 300,
+        min_sleep: float = 1,
+        margin: float = 1,
+        retry_after: float = 60,
+    ):
+        self.max_sleep = max_sleep
+        self.min_sleep = min_sleep
+        self.margin = margin
+        self.retry_after = retry_after
+        self._queue: List[Tuple[float, str]] = []
+
+    def rebuild(self, state: UserState, evaluated_at: float):
+        # Actions that were already due (margin included, as the cycle checks
+        # them) when the cycle evaluated them either ran or were refused; give
+        # them retry_after instead of waking immediately.
+        queue = []
+        for action, due_at in state.deadlines.items():
+            if due_at is None:
+                continue
+            due_at += self.margin
+            if due_at <= evaluated_at:
+                due_at = evaluated_at + self.retry_after
+            queue.append((due_at, action))
+        heapq.heapify(queue)
+        self._queue = queue
+
+    def entries(self) -> List[Tuple[float, str]]:
+        return sorted(self._queue)
+
+    def peek(self) -> Optional[Tuple[float, str]]:
+        return self._queue[0] if self._queue else None
+
+    def next_wakeup(self, now: float) -> Tuple[float, Optional[str]]:
+        head = self.peek()
+        if head is None:
+            return self.max_sleep, None
+        due_at, action = head
+        delay = seconds_until(due_at, now)
+        if delay > self.max_sleep:
+            return self.max_sleep, None
+        return max(self.min_sleep, delay), action
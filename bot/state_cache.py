@@ -0,0 +1,77 @@
+import time
+from typing import Awaitable, Callable, Optional
+
+from core.model import TaskList, User
+
+
+class CachedValue:
+    __slots__ = ("ttl", "value", "fetched_at")
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.value = None
+        self.fetched_at: Optional[float] = None
+
+    def is_fresh(self, now: float) -> bool:
+        return self.fetched_at is not None and now - self.fetched_at < self.ttl
+
+    def put(self, value, now: float):
+        self.value = value
+        self.fetched_at = now
+
+    def invalidate(self):
+        self.fetched_at = None
+
+
+class StateCache:
+    # Sits between the bot and the API client. Action responses refresh the
+    # user for free via put_user; a fetch happens only when a decision needs a
+    # value whose TTL has run out.
+    def __init__(
+        self,
+        fetch_user: Callable[[], Awaitable[User]],
+        fetch_tasks: Callable[[], Awaitable[TaskList]],
+        user_ttl: float = 1800,
+        tasks_ttl: float = 600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._fetch_user = fetch_user
+        self._fetch_tasks = fetch_tasks
+        self.clock = clock
+        self._user = CachedValue(user_ttl)
+        self._tasks = CachedValue(tasks_ttl)
+        self._tasks.value = TaskList()
+
+    @property
+    def user(self) -> Optional[User]:
+        return self._user.value
+
+    @property
+    def tasks(self) -> TaskList:
+        return self._tasks.value
+
+    def set_ttls(self, user_ttl: float, tasks_ttl: float):
+        self._user.ttl = user_ttl
+        self._tasks.ttl = tasks_ttl
+
+    def put_user(self, user: User, fetched_at: Optional[float] = None):
+        self._user.put(user, self.clock() if fetched_at is None else fetched_at)
+
+    def put_tasks(self, tasks: TaskList):
+        self._tasks.put(tasks, self.clock())
+
+    def invalidate_user(self):
+        self._user.invalidate()
+
+    def invalidate_tasks(self):
+        self._tasks.invalidate()
+
+    async def get_user(self) -> User:
+        if not self._user.is_fresh(self.clock()):
+            self.put_user(await self._fetch_user())
+        return self._user.value
+
+    async def get_tasks(self) -> TaskList:
+        if not self._tasks.is_fresh(self.clock()):
+            self.put_tasks(await self._fetch_tasks())
+        return self._tasks.value
@@ -0,0 +1,98 @@
+import math
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+from core.logger import logger
+
+
+class ServerClock:
+    # Tracks offset = server time - local time so deadlines taken from server
+    # timestamps can be compared with "now" on the server's clock.
+    #
+    # Every response gives a sample: the server stamped it somewhere between
+    # sending the request and receiving the reply, so the midpoint is the best
+    # guess and half the round trip (plus the stamp's resolution) is the error.
+    # Samples are blended with a one-dimensional Kalman filter: precise ones
+    # (action timestamps, microseconds) outweigh coarse ones (Date headers,
+    # whole seconds), and the estimate's uncertainty grows with time to allow
+    # for drift. A run of outliers means the local clock jumped and resets it.
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.time,
+        drift: float = 1e-4,
+        outlier_sigmas: float = 5,
+        outliers_to_reset: int = 3,
+    ):
+        self.clock = clock
+        self.drift = drift
+        self.outlier_sigmas = outlier_sigmas
+        self.outliers_to_reset = outliers_to_reset
+        self.offset = 0.0
+        self.variance: Optional[float] = None
+        self.samples = 0
+        self._updated_at = 0.0
+        self._outliers = 0
+
+    def now(self) -> float:
+        return self.clock() + self.offset
+
+    def to_local(self, server_time: float) -> float:
+        return server_time - self.offset
+
+    def observe(
+        self,
+        server_time: float,
+        sent_at: float,
+        received_at: float,
+        resolution: float = 0.0,
+    ):
+        # A stamp truncated to `resolution` lies in [t, t + resolution).
+        sample = server_time + resolution / 2 - (sent_at + received_at) / 2
+        noise = ((received_at - sent_at) / 2 + resolution / 2) ** 2 + 1e-6
+
+        if self.variance is None:
+            self._reset(sample, noise, received_at)
+            return
+
+        variance = self.variance + (self.drift * (received_at - self._updated_at)) ** 2
+        if abs(sample - self.offset) > self.outlier_sigmas * math.sqrt(
+            variance + noise
+        ):
+            self._outliers += 1
+            if self._outliers >= self.outliers_to_reset:
+                logger.warning(
+                    "Server clock offset jumped from %.3fs to %.3fs",
+                    self.offset,
+                    sample,
+                )
+                self._reset(sample, noise, received_at)
+            return
+
+        gain = variance / (variance + noise)
+        self.offset += gain * (sample - self.offset)
+        self.variance = (1 - gain) * variance
+        self.samples += 1
+        self._updated_at = received_at
+        self._outliers = 0
+
+    def _reset(self, sample: float, noise: float, received_at: float):
+        self.offset = sample
+        self.variance = noise
+        self.samples = 1
+        self._updated_at = received_at
+        self._outliers = 0
+
+    def observe_date_header(
+        self, value: Optional[str], sent_at: float, received_at: float
+    ):
+        if not value:
+            return
+        try:
+            server_time = parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            return
+        self.observe(server_time, sent_at, received_at, resolution=1.0)
+
+
+server_clock = ServerClock()
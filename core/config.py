@@ -1,12 +1,207 @@
+import json
+import math
 import os
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+TRUE = ("1", "true", "yes", "on")
+FALSE = ("0", "false", "no", "off", "")
 
+
+class ConfigError(ValueError):
+    pass
+
+
+def setting(
+    default,
+    env: str = None,
+    minimum: float = None,
+    maximum: float = None,
+    choices: Tuple[str, ...] = None,
+    reload: bool = True,
+):
+    # reload=False: read once at startup (sockets, files, logging); a changed
+    # value in the config file only takes effect after a restart.
+    return field(
+        default=default,
+        metadata={
+            "env": env,
+            "minimum": minimum,
+            "maximum": maximum,
+            "choices": choices,
+            "reload": reload,
+        },
+    )
+
+
+@dataclass
 class Config:
-    APP_HOST: str = os.getenv("APP_HOST")
+    # Defaults, overridden by the JSON file CONFIG_FILE, overridden by the
+    # environment (.env included). Durations are in seconds.
+    APP_HOST: str = setting("", reload=False)
+    HEADLESS: bool = setting(False, env="APP_HEADLESS", reload=False)
+    DASHBOARD_REFRESH: float = setting(1.0, minimum=0, reload=False)
+    USER_TTL: float = setting(1800.0, minimum=0)
+    TASKS_TTL: float = setting(600.0, minimum=0)
+    HTTP_TIMEOUT: float = setting(10.0, minimum=0.1)
+    RETRY_ATTEMPTS: int = setting(4, minimum=1)
+    RETRY_BASE_DELAY: float = setting(1.0, minimum=0)
+    RETRY_MAX_DELAY: float = setting(60.0, minimum=0)
+    BREAKER_THRESHOLD: int = setting(5, minimum=1)
+    BREAKER_RESET: float = setting(60.0, minimum=0)
+    ACTION_RATE: float = setting(0.5, minimum=0)
+    ACTION_BURST: float = setting(3.0, minimum=1)
+    # Scheduling: the longest sleep between cycles, the shortest, the slack
+    # added after a deadline, and the wait before re-trying a refused action.
+    MAX_SLEEP: float = setting(300.0, minimum=1)
+    MIN_SLEEP: float = setting(1.0, minimum=0)
+    DEADLINE_MARGIN: float = setting(1.0, minimum=0)
+    RETRY_AFTER: float = setting(60.0, minimum=1)
+    # Back-off after consecutive failed cycles; the last delay repeats until a
+    # cycle succeeds.
+    CYCLE_RETRY_DELAYS: Tuple[float, ...] = setting((5.0, 10.0, 30.0, 60.0), minimum=0)
+    # Game rules the bot cannot read from the API.
+    CLAIM_COOLDOWN: float = setting(75 * 60.0, minimum=0)
+    IMMUNITY_COOLDOWN: float = setting(90 * 60.0, minimum=0)
+    FUEL_DELAYS: Tuple[float, ...] = setting(
+        (1800.0, 3600.0, 5400.0, 7200.0, 9000.0), minimum=0
+    )
+    SHIELD_MIN_BALANCE: float = setting(15.0)
+    IMMUNITY_MIN_BALANCE: float = setting(8.0)
+    # How long an advertisement task takes to count as watched.
+    TASK_AD_SECONDS: float = setting(10.0, minimum=0)
+    SESSION_FILE: str = setting("session.json", reload=False)
+    METRICS_PORT: int = setting(0, minimum=0, maximum=65535, reload=False)
+    METRICS_FILE: str = setting("logs/metrics.json", reload=False)
+    METRICS_INTERVAL: float = setting(60.0, minimum=1, reload=False)
+    HISTORY_DB: str = setting("history.db", reload=False)
+    PROFILE: str = setting("")
+    PROFILE_DIR: str = setting("profiles")
+    CONTROL_SOCKET: str = setting("control.sock", reload=False)
+    CONTROL_PORT: int = setting(0, minimum=0, maximum=65535, reload=False)
+    CONFIG_POLL: float = setting(2.0, minimum=0.1)
+    LOG_API_FORMAT: str = setting("text", choices=("text", "jsonl"), reload=False)
+    LOG_API_BODY_LIMIT: int = setting(0, minimum=0, reload=False)
+    LOG_API_SAMPLE_RATE: float = setting(1.0, minimum=0, maximum=1, reload=False)
+    # Size at which a log file is rotated, and the archive budget per log.
+    LOG_SEGMENT_MB: float = setting(10.0, minimum=0.1, reload=False)
+    LOG_ARCHIVE_MB: float = setting(50.0, minimum=0, reload=False)
+
+    def __post_init__(self):
+        self.path = os.getenv("CONFIG_FILE", "config.json")
+        self.mtime: Optional[float] = None
+
+    def load(self):
+        self.mtime = _mtime(self.path)
+        values = self._read()
+        for name, value in values.items():
+            setattr(self, name, value)
+        return self
+
+    def changed_on_disk(self) -> bool:
+        return _mtime(self.path) != self.mtime
+
+    def reload(self) -> Tuple[Dict[str, Tuple[object, object]], List[str]]:
+        # Returns {name: (old, new)} for the settings that were applied and the
+        # changed ones that need a restart. An invalid file raises ConfigError
+        # (once per edit) and leaves every value unchanged.
+        self.mtime = _mtime(self.path)
+        values = self._read()
+        applied, pending = {}, []
+        for item in fields(self):
+            old, new = getattr(self, item.name), values[item.name]
+            if old == new:
+                continue
+            if not item.metadata["reload"]:
+                pending.append(item.name)
+                continue
+            setattr(self, item.name, new)
+            applied[item.name] = (old, new)
+        return applied, pending
+
+    def _read(self) -> Dict[str, object]:
+        data = {}
+        if self.mtime is not None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                raise ConfigError(f"{self.path}: {e}") from e
+            if not isinstance(data, dict):
+                raise ConfigError(f"{self.path}: expected a JSON object")
+            unknown = set(data) - {item.name for item in fields(self)}
+            if unknown:
+                raise ConfigError(f"{self.path}: unknown settings {sorted(unknown)}")
+
+        values, errors = {}, []
+        for item in fields(self):
+            env = os.getenv(item.metadata["env"] or item.name)
+            raw = env if env is not None else data.get(item.name, item.default)
+            try:
+                values[item.name] = _validate(item, _coerce(raw, item.type))
+            except (TypeError, ValueError) as e:
+                errors.append(f"{item.name}={raw!r}: {e}")
+        if errors:
+            raise ConfigError("Invalid configuration: " + "; ".join(errors))
+        return values
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _coerce(value, kind):
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in TRUE:
+            return True
+        if text in FALSE:
+            return False
+        raise ValueError("expected a boolean")
+    if kind == Tuple[float, ...]:
+        items = value.split(",") if isinstance(value, str) else value
+        if isinstance(items, (int, float)):
+            raise ValueError("expected a list of numbers")
+        return tuple(_number(item, float) for item in items)
+    if kind in (int, float):
+        return _number(value, kind)
+    return kind(value)
+
+
+def _number(value, kind):
+    # JSON true would otherwise pass as 1; nan and inf slip past every bound.
+    if isinstance(value, bool):
+        raise ValueError("expected a number")
+    if kind is int and isinstance(value, float) and not value.is_integer():
+        raise ValueError("expected an integer")
+    number = kind(value)
+    if not math.isfinite(number):
+        raise ValueError("expected a finite number")
+    return number
+
+
+def _validate(item, value):
+    minimum, maximum = item.metadata["minimum"], item.metadata["maximum"]
+    choices = item.metadata["choices"]
+    if isinstance(value, tuple) and not value:
+        raise ValueError("must not be empty")
+    for number in value if isinstance(value, tuple) else (value,):
+        if minimum is not None and number < minimum:
+            raise ValueError(f"must be at least {minimum}")
+        if maximum is not None and number > maximum:
+            raise ValueError(f"must be at most {maximum}")
+    if choices and value not in choices:
+        raise ValueError(f"must be one of {', '.join(choices)}")
+    return value
 
 
-config = Config()
+config = Config().load()
@@ -0,0 +1,263 @@
+import argparse
+import atexit
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from core.logger import logger
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    ts REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actions (
+    ts REAL NOT NULL,
+    action TEXT NOT NULL,
+    result TEXT NOT NULL,
+    duration REAL NOT NULL,
+    reward REAL,
+    balance REAL,
+    level_fuel INTEGER,
+    shield INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS states (
+    ts REAL NOT NULL,
+    balance REAL NOT NULL,
+    level_fuel INTEGER NOT NULL,
+    shield INTEGER NOT NULL
+);
+-- Every query filters on a time range first; the extra columns make the
+-- indexes covering so range scans never touch the table rows.
+CREATE INDEX IF NOT EXISTS requests_ts ON requests (ts, endpoint, ok, duration);
+CREATE INDEX IF NOT EXISTS actions_ts ON actions (ts, action, result, reward, duration);
+CREATE INDEX IF NOT EXISTS states_ts ON states (ts, balance);
+"""
+
+INSERTS = {
+    "requests": "INSERT INTO requests VALUES (?, ?, ?, ?, ?)",
+    "actions": "INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "states": "INSERT INTO states VALUES (?, ?, ?, ?)",
+}
+
+
+def connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class EventStore:
+    # Append-only history in SQLite. record_* only enqueue a row; a writer
+    # thread drains the queue and commits in batches, so the request path
+    # never waits on disk. Until open() is called every record_* is a no-op.
+    def __init__(
+        self,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        queue_size: int = 10000,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.path: Optional[str] = None
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._writer: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._writer is not None
+
+    def open(self, path: str):
+        connection = connect(path)
+        with connection:
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.path = path
+        self._writer = threading.Thread(
+            target=self._run, args=(connection,), name="history-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+
+    def _put(self, table: str, row: Tuple):
+        if self._writer is None:
+            return
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self, connection: sqlite3.Connection):
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                running = False
+            self._write(connection, batch)
+        connection.close()
+
+    def _write(self, connection: sqlite3.Connection, batch: List[Tuple[str, Tuple]]):
+        if not batch:
+            return
+        try:
+            with connection:
+                for table, sql in INSERTS.items():
+                    rows = [row for name, row in batch if name == table]
+                    if rows:
+                        connection.executemany(sql, rows)
+        except sqlite3.Error as e:
+            logger.error("Failed to write %d history events: %s", len(batch), e)
+
+    def record_request(self, endpoint: str, status: str, duration: float):
+        self._put(
+            "requests",
+            (time.time(), endpoint, status, int(status.startswith("2")), duration),
+        )
+
+    def record_action(
+        self,
+        action: str,
+        result: str,
+        duration: float,
+        user=None,
+        reward: Optional[float] = None,
+        error: Optional[str] = None,
+    ):
+        self._put(
+            "actions",
+            (
+                time.time(),
+                action,
+                result,
+                duration,
+                reward,
+                user.balance if user else None,
+                user.level_fuel if user else None,
+                user.shield if user else None,
+                error,
+            ),
+        )
+
+    def record_state(self, user):
+        self._put("states", (time.time(), user.balance, user.level_fuel, user.shield))
+
+
+def balance_history(
+    connection: sqlite3.Connection,
+    since: float,
+    until: float = None,
+    bucket: float = 3600,
+) -> List[Tuple[float, float]]:
+    # Last balance seen in each bucket; SQLite returns the row holding MAX(ts).
+    rows = connection.execute(
+        "SELECT CAST(ts / :bucket AS INTEGER) * :bucket, balance, MAX(ts) FROM states "
+        "WHERE ts >= :since AND ts < :until GROUP BY 1 ORDER BY 1",
+        {"bucket": bucket, "since": since, "until": until or time.time() + 1},
+    )
+    return [(start, balance) for start, balance, _ in rows]
+
+
+def reward_rates(connection: sqlite3.Connection, since: float) -> List[dict]:
+    hours = max((time.time() - since) / 3600, 1e-9)
+    rows = connection.execute(
+        "SELECT action, COUNT(*), SUM(result = 'success'), TOTAL(reward), AVG(duration) "
+        "FROM actions WHERE ts >= ? GROUP BY action ORDER BY action",
+        (since,),
+    )
+    return [
+        {
+            "action": action,
+            "attempts": attempts,
+            "succeeded": succeeded,
+            "reward": reward,
+            "reward_per_hour": reward / hours,
+            "mean_duration": duration,
+        }
+        for action, attempts, succeeded, reward, duration in rows
+    ]
+
+
+def failure_rates(connection: sqlite3.Connection, since: float) -> List[dict]:
+    rows = connection.execute(
+        "SELECT endpoint, COUNT(*), COUNT(*) - SUM(ok), AVG(duration) "
+        "FROM requests WHERE ts >= ? GROUP BY endpoint ORDER BY endpoint",
+        (since,),
+    )
+    return [
+        {
+            "endpoint": endpoint,
+            "requests": total,
+            "failures": failures,
+            "failure_rate": failures / total,
+            "mean_duration": duration,
+        }
+        for endpoint, total, failures, duration in rows
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Query the bot's event history.")
+    parser.add_argument("query", choices=("balance", "rewards", "failures"))
+    parser.add_argument("--db", default="history.db")
+    parser.add_argument("--hours", type=float, default=24, help="look-back window")
+    parser.add_argument(
+        "--bucket", type=float, default=3600, help="balance bucket in seconds"
+    )
+    args = parser.parse_args(argv)
+
+    connection = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    since = time.time() - args.hours * 3600
+    if args.query == "balance":
+        for start, balance in balance_history(connection, since, bucket=args.bucket):
+            print(
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(start))}  {balance:.2f}"
+            )
+    elif args.query == "rewards":
+        for row in reward_rates(connection, since):
+            print(
+                f"{row['action']:<16} {row['succeeded']}/{row['attempts']} ok  "
+                f"{row['reward']:.2f} total  {row['reward_per_hour']:.2f}/h  "
+                f"{row['mean_duration'] * 1000:.0f} ms"
+            )
+    else:
+        for row in failure_rates(connection, since):
+            print(
+                f"{row['endpoint']:<24} {row['failures']}/{row['requests']} failed "
+                f"({row['failure_rate']:.1%})  {row['mean_duration'] * 1000:.0f} ms"
+            )
+    return 0
+
+
+history = EventStore()
+
+if __name__ == "__main__":
+    sys.exit(main())
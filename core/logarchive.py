@@ -0,0 +1,438 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+INDEX_VERSION = 1
+BLOCK_SIZE = 1024 * 1024
+COMPRESSION_LEVEL = 9
+
+# "2026-10-18 10:15:00,123 - GameBot.api - INFO - API Response - Endpoint: ..."
+TEXT_LINE = re.compile(
+    r"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),(\d{3}) - \S+ - (\w+) - "
+    r"(?:API Response - Endpoint: (\S+), Status: (\w+))?"
+)
+# ApiFormatter's jsonl output always starts with these three keys.
+JSON_LINE = re.compile(r'\{"ts":([\d.]+),"endpoint":"([^"]*)","status":"(\w+)"')
+ERROR_LEVELS = ("ERROR", "CRITICAL")
+
+# Rotated segments are named <log>.<YYYYmmdd-HHMMSS>[-n]; archives add .zst.
+STAMP = r"(\d{8}-\d{6})(?:-(\d+))?"
+
+Entry = Tuple[Optional[float], Optional[str], bool]
+
+
+@lru_cache(maxsize=4096)
+def _local_epoch(text: str) -> float:
+    # Consecutive lines mostly share their second; strptime is the slow part.
+    return time.mktime(time.strptime(text, "%Y-%m-%d %H:%M:%S"))
+
+
+def parse_line(line: str) -> Entry:
+    # (timestamp, endpoint, is_error); (None, None, False) for continuation
+    # lines such as tracebacks, which belong to the entry above them.
+    match = JSON_LINE.match(line)
+    if match:
+        return float(match[1]), match[2], match[3] == "error"
+    match = TEXT_LINE.match(line)
+    if match:
+        stamp = _local_epoch(match[1])
+        error = match[3] in ERROR_LEVELS or match[5] == "error"
+        return stamp + int(match[2]) / 1000, match[4], error
+    return None, None, False
+
+
+def parse_lines(lines: Iterable[str]) -> Iterator[Tuple[str, Entry]]:
+    entry: Entry = (None, None, False)
+    for line in lines:
+        parsed = parse_line(line)
+        if parsed[0] is not None:
+            entry = parsed
+        yield line, entry
+
+
+class BlockStats:
+    __slots__ = ("start", "end", "lines", "errors", "endpoints")
+
+    def __init__(self):
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+        self.lines = 0
+        self.errors = 0
+        self.endpoints: Dict[str, List[int]] = {}
+
+    def add(self, entry: Entry, first_line: bool):
+        stamp, endpoint, error = entry
+        self.lines += 1
+        if not first_line or stamp is None:
+            return
+        if self.start is None:
+            self.start = stamp
+        self.end = stamp
+        self.errors += error
+        if endpoint:
+            counts = self.endpoints.setdefault(endpoint, [0, 0])
+            counts[0] += 1
+            counts[1] += error
+
+    def merge(self, other: "BlockStats"):
+        if other.start is not None:
+            self.start = other.start if self.start is None else self.start
+            self.end = other.end
+        self.lines += other.lines
+        self.errors += other.errors
+        for endpoint, (count, errors) in other.endpoints.items():
+            counts = self.endpoints.setdefault(endpoint, [0, 0])
+            counts[0] += count
+            counts[1] += errors
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start,
+            "end": self.end,
+            "lines": self.lines,
+            "errors": self.errors,
+            "endpoints": self.endpoints,
+        }
+
+
+def matches(
+    stats: dict,
+    since: Optional[float],
+    until: Optional[float],
+    endpoint: Optional[str],
+    errors: bool,
+) -> bool:
+    # Same test for a whole segment and for one block of it.
+    if stats["start"] is None:
+        return False
+    if since is not None and stats["end"] < since:
+        return False
+    if until is not None and stats["start"] > until:
+        return False
+    if endpoint is not None:
+        counts = stats["endpoints"].get(endpoint)
+        return bool(counts and (counts[1] if errors else counts[0]))
+    return bool(stats["errors"]) if errors else True
+
+
+class LogArchiver:
+    # Compresses rotated segments on a background thread. Each segment becomes
+    # a series of independent zstd frames of about BLOCK_SIZE raw bytes, with
+    # a JSON sidecar (.idx) giving each frame's offset, time range, error
+    # count and endpoints, so a search decompresses only the frames it needs.
+    # Without zstandard the segment stays as it is and only gets the index.
+    def __init__(self, archive_bytes: int = 50 * 1024 * 1024):
+        self.archive_bytes = archive_bytes
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, segment: str):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="log-archiver", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(segment)
+
+    def join(self):
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            segment = self._queue.get()
+            try:
+                self.archive(segment)
+                self.prune(segment.rsplit(".", 1)[0])
+            except Exception as e:
+                logging.getLogger("GameBot").error(
+                    "Failed to archive %s: %s", segment, e
+                )
+            finally:
+                self._queue.task_done()
+
+    def archive(self, segment: str) -> str:
+        try:
+            import zstandard
+        except ImportError:
+            compressor = None
+        else:
+            compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+
+        data_path = f"{segment}.zst" if compressor else segment
+        total = BlockStats()
+        blocks = []
+        offset = 0
+        out = open(f"{data_path}.tmp", "wb") if compressor else None
+        try:
+            with open(segment, "rb") as f:
+                for chunk, stats in _blocks(f):
+                    if compressor:
+                        frame = compressor.compress(chunk)
+                        out.write(frame)
+                        length = len(frame)
+                    else:
+                        length = len(chunk)
+                    blocks.append(
+                        {"offset": offset, "length": length, **stats.to_dict()}
+                    )
+                    offset += length
+                    total.merge(stats)
+        finally:
+            if out is not None:
+                out.close()
+
+        index = {
+            "version": INDEX_VERSION,
+            "data": os.path.basename(data_path),
+            "codec": "zstd" if compressor else "none",
+            **total.to_dict(),
+            "blocks": blocks,
+        }
+        with open(f"{segment}.idx.tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        # Data first, then its index, then the raw segment: a crash at any
+        # point leaves either a raw segment to redo or a complete archive.
+        if compressor:
+            os.replace(f"{data_path}.tmp", data_path)
+        os.replace(f"{segment}.idx.tmp", f"{segment}.idx")
+        if compressor:
+            os.remove(segment)
+        return data_path
+
+    def prune(self, base: str):
+        used = 0
+        for segment in reversed(segments(base, indexed=True)):
+            data = os.path.join(os.path.dirname(segment), _data_name(segment))
+            files = [data, f"{segment}.idx"]
+            used += sum(os.path.getsize(path) for path in files if os.path.exists(path))
+            if used > self.archive_bytes:
+                for path in files:
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    def recover(self, base: str):
+        # Picks up segments left raw by a crash, and numbered backups from the
+        # plain RotatingFileHandler this replaces.
+        for path in glob.glob(f"{glob.escape(base)}.[0-9]"):
+            os.rename(path, segment_name(base, os.path.getmtime(path)))
+        for segment in segments(base, indexed=False):
+            self.submit(segment)
+
+
+def _data_name(segment: str) -> str:
+    with open(f"{segment}.idx", encoding="utf-8") as f:
+        return json.load(f)["data"]
+
+
+def _blocks(f) -> Iterator[Tuple[bytes, BlockStats]]:
+    # Blocks end on line boundaries and never split an entry from its
+    # continuation lines, so every block parses on its own.
+    lines: List[bytes] = []
+    size = 0
+    stats = BlockStats()
+    entry: Entry = (None, None, False)
+    for raw in f:
+        line = raw.decode("utf-8", errors="replace")
+        parsed = parse_line(line)
+        if parsed[0] is not None:
+            if size >= BLOCK_SIZE:
+                yield b"".join(lines), stats
+                lines, size, stats = [], 0, BlockStats()
+            entry = parsed
+        lines.append(raw)
+        size += len(raw)
+        stats.add(entry, parsed[0] is not None)
+    if lines:
+        yield b"".join(lines), stats
+
+
+def segment_name(base: str, when: Optional[float] = None) -> str:
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(when))
+    name, n = f"{base}.{stamp}", 0
+    while os.path.exists(name) or os.path.exists(f"{name}.idx"):
+        n += 1
+        name = f"{base}.{stamp}-{n}"
+    return name
+
+
+def segments(base: str, indexed: bool) -> List[str]:
+    # Segment paths (without .zst/.idx) that do or do not have an index yet,
+    # oldest first. Collision suffixes sort as numbers, so "-10" follows "-9".
+    pattern = re.compile(re.escape(os.path.basename(base)) + rf"\.{STAMP}$")
+    directory = os.path.dirname(base) or "."
+    found = {}
+    for name in os.listdir(directory):
+        stem = name[:-4] if name.endswith((".zst", ".idx")) else name
+        match = pattern.match(stem)
+        if match:
+            stamp, n = match.groups()
+            found[os.path.join(directory, stem)] = (stamp, int(n or 0))
+    return sorted(
+        (
+            segment
+            for segment in found
+            if os.path.exists(f"{segment}.idx") == indexed
+            and (indexed or os.path.exists(segment))
+        ),
+        key=found.get,
+    )
+
+
+class ArchivingFileHandler(RotatingFileHandler):
+    # Rolls over like RotatingFileHandler, but renames the full file to a
+    # time-stamped segment and hands it to the archiver instead of shifting
+    # numbered backups; the logging thread only pays for a rename.
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int,
+        archiver: LogArchiver,
+        encoding: str = "utf-8",
+    ):
+        super().__init__(filename, maxBytes=max_bytes, encoding=encoding)
+        self.archiver = archiver
+        archiver.recover(self.baseFilename)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            segment = segment_name(self.baseFilename)
+            os.rename(self.baseFilename, segment)
+            self.archiver.submit(segment)
+        self.stream = self._open()
+
+
+def _read_block(path: str, codec: str, block: dict) -> str:
+    with open(path, "rb") as f:
+        f.seek(block["offset"])
+        data = f.read(block["length"])
+    if codec == "zstd":
+        import zstandard
+
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def search(
+    base: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    endpoint: Optional[str] = None,
+    errors: bool = False,
+    text: Optional[str] = None,
+) -> Iterator[str]:
+    # Archived segments are filtered by their index and only matching blocks
+    # are read; raw segments not archived yet and the live file are scanned.
+    def wanted(entry: Entry, line: str) -> bool:
+        stamp, line_endpoint, error = entry
+        if stamp is None:
+            return False
+        if since is not None and stamp < since:
+            return False
+        if until is not None and stamp > until:
+            return False
+        if endpoint is not None and line_endpoint != endpoint:
+            return False
+        if errors and not error:
+            return False
+        return text is None or text in line
+
+    directory = os.path.dirname(base) or "."
+    for segment in segments(base, indexed=True):
+        with open(f"{segment}.idx", encoding="utf-8") as f:
+            index = json.load(f)
+        if not matches(index, since, until, endpoint, errors):
+            continue
+        path = os.path.join(directory, index["data"])
+        for block in index["blocks"]:
+            if matches(block, since, until, endpoint, errors):
+                lines = _read_block(path, index["codec"], block).splitlines(True)
+                for line, entry in parse_lines(lines):
+                    if wanted(entry, line):
+                        yield line
+
+    for path in segments(base, indexed=False) + [base]:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line, entry in parse_lines(f):
+                if wanted(entry, line):
+                    yield line
+
+
+def summarize(base: str, since: Optional[float] = None) -> Iterator[dict]:
+    # Per-segment counts straight from the indexes, without decompressing.
+    for segment in segments(base, indexed=True):
+        with open(f"{segment}.idx", encoding="utf-8") as f:
+            index = json.load(f)
+        if index["end"] is None or (since is not None and index["end"] < since):
+            continue
+        data = os.path.join(os.path.dirname(segment), index["data"])
+        yield {
+            "segment": index["data"],
+            "start": index["start"],
+            "end": index["end"],
+            "lines": index["lines"],
+            "errors": index["errors"],
+            "bytes": os.path.getsize(data) if os.path.exists(data) else 0,
+            "endpoints": index["endpoints"],
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Search the bot's logs, including compressed archives."
+    )
+    parser.add_argument("--log", choices=("api", "main"), default="api")
+    parser.add_argument("--dir", default="logs")
+    parser.add_argument("--hours", type=float, help="look-back window")
+    parser.add_argument("--endpoint", help="e.g. /api/boost/buy")
+    parser.add_argument("--errors", action="store_true", help="only failures")
+    parser.add_argument("--grep", help="only lines containing this text")
+    parser.add_argument("--limit", type=int, default=0, help="stop after N lines")
+    parser.add_argument(
+        "--stats", action="store_true", help="list archived segments instead"
+    )
+    args = parser.parse_args(argv)
+
+    base = os.path.join(
+        args.dir, "gamebot_api.log" if args.log == "api" else "gamebot.log"
+    )
+    since = time.time() - args.hours * 3600 if args.hours else None
+
+    if args.stats:
+        for row in summarize(base, since):
+            print(
+                f"{row['segment']}  "
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['start']))} .. "
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['end']))}  "
+                f"{row['lines']} lines  {row['errors']} errors  "
+                f"{row['bytes'] / 1024:.0f} KiB"
+            )
+        return 0
+
+    found = 0
+    for line in search(base, since, None, args.endpoint, args.errors, args.grep):
+        sys.stdout.write(line)
+        found += 1
+        if args.limit and found >= args.limit:
+            break
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,137 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from core.config import config
+from core.logarchive import ArchivingFileHandler, LogArchiver
+
+
+# Listener per logger name, kept so close_logger can undo setup_logger.
+_listeners = {}
+
+
+class DeferredQueueHandler(QueueHandler):
+    # The stock QueueHandler formats the record on the calling thread; here the
+    # record is queued as-is and formatted by the listener thread on emit.
+    # A full queue drops the record instead of blocking the request path.
+    # A warning stamped when dropping started and another with the count are
+    # queued once there is room again; both go to the main log (notice_name).
+    def __init__(self, log_queue: queue.Queue, notice_name: str):
+        super().__init__(log_queue)
+        self.notice_name = notice_name
+        self.dropped = 0
+        self._dropping: Optional[logging.LogRecord] = None
+        self._dropped_since = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def _notice(self, message: str) -> logging.LogRecord:
+        return logging.LogRecord(
+            self.notice_name, logging.WARNING, __file__, 0, message, None, None
+        )
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self._dropping is not None:
+                # Room for both notices and the record, or keep dropping.
+                if self.queue.maxsize - self.queue.qsize() < 3:
+                    raise queue.Full
+                self.queue.put_nowait(self._dropping)
+                self.queue.put_nowait(
+                    self._notice(
+                        f"Log queue drained, {self._dropped_since} records dropped"
+                    )
+                )
+                self._dropping = None
+                self._dropped_since = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self._dropping is None:
+                self._dropping = self._notice("Log queue is full, dropping records")
+            self.dropped += 1
+            self._dropped_since += 1
+
+
+class RoutingQueueListener(QueueListener):
+    # One background thread serves every logger; each record goes only to the
+    # handler routed for its logger name, or to the default handler.
+    def __init__(self, log_queue: queue.Queue, default: logging.Handler, routes: dict):
+        super().__init__(log_queue, default, *routes.values())
+        self.default = default
+        self.routes = routes
+
+    def handle(self, record: logging.LogRecord):
+        handler = self.routes.get(record.name, self.default)
+        if record.levelno >= handler.level:
+            handler.handle(record)
+
+
+class SampleFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or getattr(record, "api_status", "success") != "success":
+            return True
+        return random.random() < self.rate
+
+
+class ApiFormatter(logging.Formatter):
+    def __init__(self, json_lines: bool = False, body_limit: int = 0):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        self.json_lines = json_lines
+        self.body_limit = body_limit
+
+    def _truncate(self, body: str) -> str:
+        if self.body_limit and len(body) > self.body_limit:
+            return f"{body[: self.body_limit]}...[{len(body) - self.body_limit} more]"
+        return body
+
+    def format(self, record: logging.LogRecord) -> str:
+        body = getattr(record, "body", None)
+        if not self.json_lines:
+            record.msg = "API Response - Endpoint: %s, Status: %s, Response: %s"
+            record.args = (
+                record.endpoint,
+                record.api_status,
+                self._truncate(str(body)),
+            )
+            return super().format(record)
+
+        line = {
+            "ts": round(record.created, 3),
+            "endpoint": record.endpoint,
+            "status": record.api_status,
+        }
+        if isinstance(body, str):
+            line["body"] = self._truncate(body)
+        else:
+            encoded = json.dumps(body, separators=(",", ":"), ensure_ascii=False)
+            if self.body_limit and len(encoded) > self.body_limit:
+                line["body"] = self._truncate(encoded)
+                line["truncated"] = True
+            else:
+                line["body"] = body
+        return json.dumps(line, separators=(",", ":"), ensure_ascii=False)
 
 
 def setup_logger(
     name: str = "GameBot",
     level: int = logging.INFO,
     log_dir: str = "logs",
+    api_format: str = "text",
+    api_body_limit: int = 0,
+    api_sample_rate: float = 1.0,
+    segment_bytes: int = 10 * 1024 * 1024,
+    archive_bytes: int = 50 * 1024 * 1024,
+    queue_size: int = 10000,
 ) -> logging.Logger:
     logger = logging.getLogger(name)
 
@@ -18,40 +143,78 @@ def setup_logger(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
         )
 
+        # Full files are compressed and indexed in the background; each log
+        # keeps archive_bytes of archives (see core.logarchive).
+        archiver = LogArchiver(archive_bytes)
         main_log_file = os.path.join(log_dir, f"{name.lower()}.log")
-        file_handler = RotatingFileHandler(
-            main_log_file,
-            maxBytes=10 * 1024 * 1024,
-            backupCount=5,
-            encoding="utf-8",
-        )
+        file_handler = ArchivingFileHandler(main_log_file, segment_bytes, archiver)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
 
         api_log_file = os.path.join(log_dir, f"{name.lower()}_api.log")
-        api_handler = RotatingFileHandler(
-            api_log_file,
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5,
-            encoding="utf-8",
+        api_handler = ArchivingFileHandler(api_log_file, segment_bytes, archiver)
+        api_handler.setFormatter(
+            ApiFormatter(json_lines=api_format == "jsonl", body_limit=api_body_limit)
+        )
+
+        # API records go to their own child logger, so the main log no longer
+        # receives them and the API handler no longer filters every record.
+        api_logger = logging.getLogger(f"{name}.api")
+        api_logger.propagate = False
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        queue_handler = DeferredQueueHandler(log_queue, name)
+        logger.addHandler(queue_handler)
+
+        api_queue_handler = DeferredQueueHandler(log_queue, name)
+        if api_sample_rate < 1:
+            api_queue_handler.addFilter(SampleFilter(api_sample_rate))
+        api_logger.addHandler(api_queue_handler)
+
+        listener = RoutingQueueListener(
+            log_queue, file_handler, {api_logger.name: api_handler}
         )
-        api_handler.setFormatter(formatter)
-        api_handler.addFilter(lambda record: getattr(record, "api_response", False))
-        logger.addHandler(api_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        _listeners[name] = listener
 
         logger.setLevel(level)
+        api_logger.setLevel(level)
 
     return logger
 
 
+def close_logger(name: str = "GameBot"):
+    # Drains the queue, waits for pending archives and detaches the handlers,
+    # so setup_logger can start over (the soak test logs to a scratch dir).
+    listener = _listeners.pop(name, None)
+    if listener is None:
+        return
+    atexit.unregister(listener.stop)
+    listener.stop()
+    listener.default.archiver.join()
+    for handler in listener.handlers:
+        handler.close()
+    for item in (logging.getLogger(name), logging.getLogger(f"{name}.api")):
+        for handler in list(item.handlers):
+            item.removeHandler(handler)
+
+
 def log_api_response(
-    logger: logging.Logger, endpoint: str, response: str, status: str = "success"
+    logger: logging.Logger, endpoint: str, response, status: str = "success"
 ):
-    extra = {"api_response": True}
-    logger.info(
-        f"API Response - Endpoint: {endpoint}, Status: {status}, Response: {response}",
-        extra=extra,
-    )
+    # The body is attached as-is; it is only stringified if a handler emits it.
+    api_logger = logger.getChild("api")
+    if api_logger.isEnabledFor(logging.INFO):
+        api_logger.info(
+            "API Response",
+            extra={"endpoint": endpoint, "api_status": status, "body": response},
+        )
 
 
-logger = setup_logger()
+logger = setup_logger(
+    api_format=config.LOG_API_FORMAT,
+    api_body_limit=config.LOG_API_BODY_LIMIT,
+    api_sample_rate=config.LOG_API_SAMPLE_RATE,
+    segment_bytes=int(config.LOG_SEGMENT_MB * 1024 * 1024),
+    archive_bytes=int(config.LOG_ARCHIVE_MB * 1024 * 1024),
+)
@@ -0,0 +1,288 @@
+import atexit
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.logger import logger
+
+Labels = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CYCLE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [
+        '%s="%s"'
+        % (
+            name,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+class Metric(ABC):
+    # Values are keyed by the tuple of label values; a lock per metric keeps
+    # updates from the blocking client's worker threads consistent.
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = labels
+        self.values: Dict[Labels, object] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def lines(self) -> Iterator[str]:
+        pass
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            items = list(self.values.items())
+        return [
+            {"labels": dict(zip(self.label_names, labels)), "value": value}
+            for labels, value in items
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def lines(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self.values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self.values[labels] = float(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        # Per label set: [count per bucket (last is +Inf), sum, count].
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def lines(self) -> Iterator[str]:
+        with self._lock:
+            items = [
+                (labels, (list(s[0]), s[1], s[2])) for labels, s in self.values.items()
+            ]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                bucket_labels = _format_labels(self.label_names, labels, f'le="{le}"')
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_text = _format_labels(self.label_names, labels)
+            yield f"{self.name}_sum{label_text} {total}"
+            yield f"{self.name}_count{label_text} {count}"
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            items = [
+                (labels, (list(s[0]), s[1], s[2])) for labels, s in self.values.items()
+            ]
+        return [
+            {
+                "labels": dict(zip(self.label_names, labels)),
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], counts)),
+                "sum": total,
+                "count": count,
+            }
+            for labels, (counts, total, count) in items
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self._server = None
+        self._stop = threading.Event()
+
+    def _register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels=()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels=()) -> Gauge:
+        return self._register(Gauge(name, description, labels))
+
+    def histogram(
+        self, name: str, description: str, labels=(), buckets=LATENCY_BUCKETS
+    ):
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def render(self) -> str:
+        # Prometheus text exposition format, version 0.0.4.
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        return {
+            "ts": round(time.time(), 3),
+            "metrics": {
+                name: {"type": metric.kind, "values": metric.snapshot()}
+                for name, metric in self.metrics.items()
+            },
+        }
+
+    def write_snapshot(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        # Imported here so http.server is only loaded when the port is enabled.
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+        logger.info("Serving metrics on http://%s:%d/metrics", host, port)
+
+    def start_snapshots(self, path: str, interval: float):
+        def write():
+            try:
+                self.write_snapshot(path)
+            except OSError as e:
+                logger.warning("Could not write metrics snapshot %s: %s", path, e)
+
+        def loop():
+            while not self._stop.wait(interval):
+                write()
+
+        threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+        atexit.register(write)
+
+    def start(self, port: int = 0, snapshot_path: str = "", interval: float = 60):
+        if port:
+            self.serve(port)
+        if snapshot_path and interval > 0:
+            self.start_snapshots(snapshot_path, interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+metrics = MetricsRegistry()
+
+request_duration = metrics.histogram(
+    "gamebot_request_duration_seconds", "API request latency.", ("endpoint",)
+)
+requests_total = metrics.counter(
+    "gamebot_requests_total",
+    "API requests by HTTP status, or error type when there was no response.",
+    ("endpoint", "status"),
+)
+bytes_sent = metrics.counter(
+    "gamebot_request_bytes_total", "Request body bytes sent.", ("endpoint",)
+)
+bytes_received = metrics.counter(
+    "gamebot_response_bytes_total", "Response body bytes received.", ("endpoint",)
+)
+retries_total = metrics.counter(
+    "gamebot_retries_total", "Request attempts that were retried.", ("endpoint",)
+)
+actions_total = metrics.counter(
+    "gamebot_actions_total", "Actions by outcome.", ("action", "result")
+)
+cycle_duration = metrics.histogram(
+    "gamebot_cycle_duration_seconds",
+    "Time spent running due actions in one cycle.",
+    buckets=CYCLE_BUCKETS,
+)
+sleep_seconds = metrics.counter(
+    "gamebot_sleep_seconds_total",
+    "Time spent waiting, by reason (rate_limit or schedule).",
+    ("reason",),
+)
+balance = metrics.gauge("gamebot_balance", "Last known balance.")
+fuel_level = metrics.gauge("gamebot_fuel_level", "Last known fuel level.")
+shield = metrics.gauge("gamebot_shield", "Last known shield count.")
+
+
+def request_status(response=None, error: Optional[Exception] = None) -> str:
+    # HTTP status when there was a response (httpx.HTTPStatusError carries
+    # one), otherwise the error type.
+    if response is None:
+        response = getattr(error, "response", None)
+    if response is not None:
+        return str(response.status_code)
+    return type(error).__name__ if error else "unknown"
+
+
+def observe_request(endpoint: str, duration: float, status: str, response=None):
+    request_duration.observe(duration, endpoint)
+    requests_total.inc(endpoint, status)
+    if response is None:
+        return
+    bytes_sent.inc(endpoint, amount=len(response.request.content))
+    bytes_received.inc(endpoint, amount=len(response.content))
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Optional, List
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
 from enum import Enum
 
 
@@ -23,115 +24,222 @@ class FuelLevel(Enum):
         return max(cls, key=lambda x: x.level)
 
 
-@dataclass
-class TaskState:
-    completed_task: bool
-    last_completed_at: Optional[str]
-
-    @classmethod
-    def from_response(cls, data: List[dict]) -> "TaskState":
-        if not data:
-            return cls(
-                completed_task=False,
-                last_completed_at=None,
-            )
-        return cls(
-            completed_task=True,
-            last_completed_at=data[0]["locale_time"],
-        )
-
-    def is_ready(self, current_time: datetime) -> bool:
-        if self.completed_task:
-            return False
-        if self.last_completed_at:
-            task_completed_at = datetime.fromisoformat(
-                self.last_completed_at
-            ) + timedelta(hours=1)
-            return current_time > task_completed_at
-        return True
-
-
-@dataclass
-class UserState:
+@dataclass(frozen=True, slots=True)
+class User:
     balance: float
     level_fuel: int
-    claimed_last_at: Optional[str]
     shield: int
     shield_active: bool
-    shield_immunity_at: Optional[str]
+    tech_work: bool
+    claimed_last: Optional[str]
     daily_next_at: Optional[str]
     fuel_last_at: Optional[str]
-    shield_ended_at: Optional[str]
+    shield_immunity_at: Optional[str]
+    shield_free_after_at: Optional[str]
     spin_after_at: Optional[str]
-    task: TaskState
 
     @classmethod
-    def from_response(cls, data: dict, task_data: List) -> "UserState":
+    def from_response(cls, data: dict) -> "User":
         return cls(
             balance=float(data["balance"]),
             level_fuel=int(data["level_fuel"]),
-            claimed_last_at=data.get("claimed_last"),
-            shield_active=data.get("shield_active"),
-            shield_immunity_at=data.get("shield_immunity_at"),
             shield=int(data["shield"]),
+            shield_active=bool(data.get("shield_active")),
+            tech_work=bool(data.get("tech_work")),
+            claimed_last=data.get("claimed_last"),
             daily_next_at=data.get("daily_next_at"),
             fuel_last_at=data.get("fuel_last_at"),
-            shield_ended_at=data.get("shield_free_after_at"),
+            shield_immunity_at=data.get("shield_immunity_at"),
+            shield_free_after_at=data.get("shield_free_after_at"),
             spin_after_at=data.get("spin_after_at"),
-            task=TaskState.from_response(task_data),
         )
 
-    def _get_fuel_delay(self) -> int:
-        fuel_level = FuelLevel.from_level(self.level_fuel)
-        return fuel_level.delay
 
-    def should_get_fuel(self, current_time: datetime) -> bool:
-        if not self.fuel_last_at:
-            return True
+@dataclass(frozen=True, slots=True)
+class CompletedTask:
+    locale_time: Optional[str]
 
-        delay_minutes = self._get_fuel_delay()
-        next_fuel_time = datetime.fromisoformat(self.fuel_last_at) + timedelta(
-            minutes=delay_minutes
-        )
 
-        return current_time > next_fuel_time
+@dataclass(frozen=True, slots=True)
+class TaskList:
+    completed: Tuple[CompletedTask, ...] = ()
 
-    def should_claim_daily(self, current_time: datetime) -> bool:
-        if not self.daily_next_at:
-            return True
-        next_claim_time = datetime.fromisoformat(self.daily_next_at) + timedelta(
-            hours=1
+    @classmethod
+    def from_response(cls, data: List[dict]) -> "TaskList":
+        return cls(
+            completed=tuple(CompletedTask(task.get("locale_time")) for task in data)
         )
-        return current_time >= next_claim_time
 
-    def should_claim(self, current_time: datetime) -> bool:
-        if not self.claimed_last_at:
-            return True
-        next_claim_time = datetime.fromisoformat(self.claimed_last_at) + timedelta(
-            hours=1, minutes=15
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    # Server timestamps are UTC; ones without an explicit offset are read as
+    # UTC too, never as the host's local time.
+    if not value:
+        return None
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+# Deadlines are epoch seconds on the server's clock (see core.clock).
+DUE_NOW = 0.0
+
+
+def seconds_until(due_at: Optional[float], now: float) -> Optional[float]:
+    # None for an action that waits on a state change rather than the clock.
+    if due_at is None:
+        return None
+    return max(0.0, due_at - now)
+
+
+CLAIM_COOLDOWN = 75 * 60
+IMMUNITY_COOLDOWN = 90 * 60
+
+# A shield or shield immunity is only bought above these balances.
+SHIELD_MIN_BALANCE = 15
+IMMUNITY_MIN_BALANCE = 8
+
+
+@dataclass(frozen=True, slots=True)
+class GameRules:
+    # Cooldowns and thresholds the API does not report; the defaults mirror
+    # the game, config can override them (see core.config).
+    claim_cooldown: float = CLAIM_COOLDOWN
+    immunity_cooldown: float = IMMUNITY_COOLDOWN
+    shield_min_balance: float = SHIELD_MIN_BALANCE
+    immunity_min_balance: float = IMMUNITY_MIN_BALANCE
+    # Seconds between refuels, by fuel level starting at 1.
+    fuel_delays: Tuple[float, ...] = tuple(level.delay * 60 for level in FuelLevel)
+
+    def fuel_delay(self, level: int) -> float:
+        if 1 <= level <= len(self.fuel_delays):
+            return self.fuel_delays[level - 1]
+        return self.fuel_delays[-1]
+
+
+DEFAULT_RULES = GameRules()
+
+
+@dataclass(frozen=True, slots=True)
+class TaskState:
+    completed_task: bool
+
+    @classmethod
+    def from_response(cls, tasks: TaskList) -> "TaskState":
+        return cls(completed_task=bool(tasks.completed))
+
+    def ready_at(self) -> Optional[float]:
+        # A task stays in the completed list for its whole cooldown.
+        return None if self.completed_task else DUE_NOW
+
+
+@dataclass(frozen=True, slots=True)
+class UserState:
+    balance: float
+    level_fuel: int
+    shield: int
+    shield_active: bool
+    claimed_last_at: Optional[float]
+    shield_immunity_at: Optional[float]
+    daily_next_at: Optional[float]
+    fuel_last_at: Optional[float]
+    shield_ended_at: Optional[float]
+    spin_after_at: Optional[float]
+    task: TaskState
+    # Epoch seconds at which each action becomes due; None means the action
+    # waits on a state change (balance, shield or task list), not on the clock.
+    deadlines: Mapping[str, Optional[float]]
+
+    @classmethod
+    def from_response(
+        cls,
+        user: User,
+        tasks: TaskList,
+        rules: GameRules = DEFAULT_RULES,
+    ) -> "UserState":
+        claimed_last_at = parse_timestamp(user.claimed_last)
+        shield_immunity_at = parse_timestamp(user.shield_immunity_at)
+        daily_next_at = parse_timestamp(user.daily_next_at)
+        fuel_last_at = parse_timestamp(user.fuel_last_at)
+        shield_ended_at = parse_timestamp(user.shield_free_after_at)
+        spin_after_at = parse_timestamp(user.spin_after_at)
+        task = TaskState.from_response(tasks)
+
+        fuel_delay = rules.fuel_delay(user.level_fuel)
+
+        if not shield_ended_at:
+            shield_due = DUE_NOW
+        elif user.balance <= rules.shield_min_balance:
+            shield_due = None
+        elif user.shield_active:
+            # Re-bought the moment the current shield runs out.
+            shield_due = shield_ended_at
+        else:
+            shield_due = DUE_NOW
+
+        if not shield_immunity_at:
+            shield_immunity_due = DUE_NOW
+        elif user.balance > rules.immunity_min_balance:
+            shield_immunity_due = shield_immunity_at + rules.immunity_cooldown
+        else:
+            shield_immunity_due = None
+
+        deadlines = MappingProxyType(
+            {
+                "daily": daily_next_at or DUE_NOW,
+                "claim": (
+                    claimed_last_at + rules.claim_cooldown
+                    if claimed_last_at
+                    else DUE_NOW
+                ),
+                "fuel": fuel_last_at + fuel_delay if fuel_last_at else DUE_NOW,
+                "shield": shield_due,
+                "shield_immunity": shield_immunity_due,
+                "task": task.ready_at(),
+                "roulette": spin_after_at or DUE_NOW,
+            }
         )
-        return current_time > next_claim_time
-
-    def should_get_shield(self, current_time: datetime) -> bool:
-        if not self.shield_ended_at:
-            return True
-        return not self.shield_active and self.balance > 15
-
-    def should_get_shield_immunity(self, current_time: datetime) -> bool:
-        if not self.shield_immunity_at:
-            return True
-        shield_immunity_time = datetime.fromisoformat(
-            self.shield_immunity_at
-        ) + timedelta(hours=1, minutes=30)
-        return current_time > shield_immunity_time and self.balance > 8
-
-    def should_get_onclick_task(self, current_time: datetime) -> bool:
-        return self.task.is_ready(current_time)
-
-    def should_get_roulette(self, current_time: datetime) -> bool:
-        if not self.spin_after_at:
-            return True
-        spin_after_time = datetime.fromisoformat(self.spin_after_at) + timedelta(
-            hours=1
+
+        return cls(
+            balance=user.balance,
+            level_fuel=user.level_fuel,
+            shield=user.shield,
+            shield_active=user.shield_active,
+            claimed_last_at=claimed_last_at,
+            shield_immunity_at=shield_immunity_at,
+            daily_next_at=daily_next_at,
+            fuel_last_at=fuel_last_at,
+            shield_ended_at=shield_ended_at,
+            spin_after_at=spin_after_at,
+            task=task,
+            deadlines=deadlines,
         )
-        return current_time > spin_after_time
+
+    def is_due(self, action: str, now: float) -> bool:
+        due_at = self.deadlines[action]
+        return due_at is not None and now >= due_at
+
+    def seconds_until(self, action: str, now: float) -> Optional[float]:
+        return seconds_until(self.deadlines[action], now)
+
+    def should_get_fuel(self, now: float) -> bool:
+        return self.is_due("fuel", now)
+
+    def should_claim_daily(self, now: float) -> bool:
+        return self.is_due("daily", now)
+
+    def should_claim(self, now: float) -> bool:
+        return self.is_due("claim", now)
+
+    def should_get_shield(self, now: float) -> bool:
+        return self.is_due("shield", now)
+
+    def should_get_shield_immunity(self, now: float) -> bool:
+        return self.is_due("shield_immunity", now)
+
+    def should_get_onclick_task(self, now: float) -> bool:
+        return self.is_due("task", now)
+
+    def should_get_roulette(self, now: float) -> bool:
+        return self.is_due("roulette", now)
@@ -0,0 +1,336 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from core.logger import logger
+
+TRACE = "trace"
+CPROFILE = "cprofile"
+SAMPLE = "sample"
+TRACEMALLOC = "tracemalloc"
+MODES = (TRACE, CPROFILE, SAMPLE, TRACEMALLOC)
+
+_NULL_SPAN = nullcontext()
+
+
+def parse_modes(modes: Union[str, Iterable[str]]) -> frozenset:
+    if isinstance(modes, str):
+        modes = modes.split(",")
+    selected = frozenset(mode.strip().lower() for mode in modes if mode.strip())
+    unknown = selected - set(MODES)
+    if unknown:
+        raise ValueError(f"Unknown profiling modes: {', '.join(sorted(unknown))}")
+    return selected
+
+
+class StackSampler:
+    # Poor man's sampling profiler: a thread reads every other thread's current
+    # frame each interval and counts folded stacks (flamegraph.pl format),
+    # rooted at the thread's name. The blocking client's requests run in
+    # worker threads, so the event loop thread alone would miss them.
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profiler-sampler", daemon=True
+        )
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            threads = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                    )
+                    frame = frame.f_back
+                names.append(threads.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class HttpTraceRecorder:
+    # Turns httpcore's "<phase>.started" / "<phase>.complete" trace callbacks
+    # (connect_tcp, start_tls, send_request_headers, ...) into spans.
+    def __init__(self, profiler: "Profiler", endpoint: str):
+        self.profiler = profiler
+        self.endpoint = endpoint
+        self.started: Dict[str, float] = {}
+
+    def trace(self, event_name: str, info: dict):
+        phase, _, stage = event_name.rpartition(".")
+        if stage == "started":
+            self.started[phase] = self.profiler.now_us()
+            return
+        start = self.started.pop(phase, None)
+        if start is not None:
+            self.profiler.add_complete(
+                phase,
+                "http",
+                start,
+                self.profiler.now_us() - start,
+                {"endpoint": self.endpoint, "outcome": stage},
+            )
+
+    async def async_trace(self, event_name: str, info: dict):
+        self.trace(event_name, info)
+
+
+class Profiler:
+    # Everything is off by default and span() then returns a shared null
+    # context, so the hooks can stay in the hot path. Events are kept in a
+    # bounded buffer and exported as Chrome trace-event JSON (chrome://tracing
+    # or https://ui.perfetto.dev).
+    def __init__(self, max_events: int = 200000):
+        self.modes = frozenset()
+        self.output_dir = "profiles"
+        self.events = deque(maxlen=max_events)
+        self.thread_names: Dict[int, str] = {}
+        self.pid = os.getpid()
+        self._origin = time.perf_counter_ns()
+        self._cycle = 0
+        # Profiles of worker-thread calls made during the current cycle.
+        self._thread_profiles: Optional[List] = None
+        self._memory_snapshot = None
+        self._exit_hook = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.modes)
+
+    @property
+    def tracing(self) -> bool:
+        return TRACE in self.modes
+
+    def now_us(self) -> float:
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    def enable(self, modes: Union[str, Iterable[str]], output_dir: str = None):
+        self.modes = parse_modes(modes)
+        if output_dir:
+            self.output_dir = output_dir
+        if TRACEMALLOC in self.modes:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._memory_snapshot = None
+        if self.modes and not self._exit_hook:
+            atexit.register(self.export)
+            self._exit_hook = True
+        logger.info("Profiling enabled: %s", ", ".join(sorted(self.modes)))
+
+    def disable(self) -> Optional[str]:
+        path = self.export()
+        if TRACEMALLOC in self.modes:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._memory_snapshot = None
+        self.modes = frozenset()
+        logger.info("Profiling disabled")
+        return path
+
+    def toggle(self, modes: Union[str, Iterable[str]], output_dir: str = None):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable(modes, output_dir)
+
+    def _path(self, name: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, name)
+
+    def add_complete(
+        self,
+        name: str,
+        category: str,
+        start_us: float,
+        duration_us: float,
+        args: dict = None,
+    ):
+        thread = threading.current_thread()
+        self.thread_names.setdefault(thread.ident, thread.name)
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_us,
+            "dur": duration_us,
+            "pid": self.pid,
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def add_counter(self, name: str, values: Dict[str, float]):
+        self.events.append(
+            {
+                "name": name,
+                "ph": "C",
+                "ts": self.now_us(),
+                "pid": self.pid,
+                "args": values,
+            }
+        )
+
+    @contextmanager
+    def _span(self, name: str, category: str, args: dict):
+        start = self.now_us()
+        try:
+            yield
+        finally:
+            self.add_complete(name, category, start, self.now_us() - start, args)
+
+    def span(self, name: str, category: str = "bot", **args):
+        if TRACE not in self.modes:
+            return _NULL_SPAN
+        return self._span(name, category, args)
+
+    def http_extensions(self, endpoint: str, is_async: bool) -> Optional[dict]:
+        # Passed to httpx as request extensions; None leaves httpx untouched.
+        if TRACE not in self.modes:
+            return None
+        recorder = HttpTraceRecorder(self, endpoint)
+        return {"trace": recorder.async_trace if is_async else recorder.trace}
+
+    def threaded(self, function: Callable) -> Callable:
+        # Wraps a function about to run in a worker thread. Before Python 3.12
+        # cProfile only sees the thread it was enabled on, so each call gets
+        # its own profile, merged into the cycle's profile when the cycle ends.
+        if self._thread_profiles is None:
+            return function
+
+        def run(*args, **kwargs):
+            import cProfile
+
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # 3.12+: the cycle's profile already covers every thread.
+                return function(*args, **kwargs)
+            self._thread_profiles.append(profile)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profile.disable()
+
+        return run
+
+    @contextmanager
+    def cycle(self):
+        if not self.modes:
+            yield
+            return
+
+        self._cycle += 1
+        number = self._cycle
+        profile = sampler = None
+        if CPROFILE in self.modes:
+            import cProfile
+
+            profile = cProfile.Profile()
+            self._thread_profiles = []
+            profile.enable()
+        if SAMPLE in self.modes:
+            sampler = StackSampler()
+            sampler.start()
+        try:
+            with self.span("cycle", "cycle", cycle=number):
+                yield
+        finally:
+            if profile is not None:
+                import pstats
+
+                profile.disable()
+                stats = pstats.Stats(profile)
+                for thread_profile in self._thread_profiles:
+                    stats.add(thread_profile)
+                self._thread_profiles = None
+                stats.dump_stats(self._path(f"cycle-{number}.prof"))
+            if sampler is not None:
+                sampler.stop()
+                sampler.write(self._path(f"cycle-{number}.folded"))
+            if TRACEMALLOC in self.modes:
+                self._diff_memory(number)
+
+    def _diff_memory(self, number: int, limit: int = 10):
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self.add_counter(
+            "traced memory", {"current_kb": current / 1024, "peak_kb": peak / 1024}
+        )
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                # The profilers' own bookkeeping would otherwise top the diff.
+                tracemalloc.Filter(False, "*cProfile.py"),
+                tracemalloc.Filter(False, __file__),
+            )
+        )
+        previous, self._memory_snapshot = self._memory_snapshot, snapshot
+        if previous is None:
+            return
+        stats = snapshot.compare_to(previous, "lineno")[:limit]
+        with open(
+            self._path(f"cycle-{number}.memdiff.txt"), "w", encoding="utf-8"
+        ) as f:
+            for stat in stats:
+                f.write(f"{stat}\n")
+        growth = sum(stat.size_diff for stat in stats)
+        logger.info(
+            "Cycle %d: top allocation sites grew by %.1f KiB", number, growth / 1024
+        )
+
+    def export(self, path: str = None) -> Optional[str]:
+        if not self.events:
+            return None
+        path = path or self._path(f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self.pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self.thread_names.items()
+        ]
+        events = list(self.events)
+        self.events.clear()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        logger.info("Wrote trace with %d events to %s", len(events), path)
+        return path
+
+
+profiler = Profiler()
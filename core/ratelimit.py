@@ -0,0 +1,57 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    # rate tokens per second, up to capacity banked for bursts. A rate of 0
+    # disables limiting.
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def configure(self, rate: float, capacity: float):
+        self._refill()
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        # Takes a token now and returns how long the caller must wait for it.
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    async def acquire(self, cancel: Optional[asyncio.Event] = None) -> float:
+        # Waits for a token; setting cancel ends the wait early and hands the
+        # token back. Returns the time spent waiting.
+        delay = self.reserve()
+        if not delay:
+            return 0.0
+        if cancel is None:
+            await asyncio.sleep(delay)
+            return delay
+        started = self.clock()
+        try:
+            await asyncio.wait_for(cancel.wait(), delay)
+        except asyncio.TimeoutError:
+            return delay
+        self.tokens += 1
+        return self.clock() - started
@@ -0,0 +1,56 @@
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields
+from typing import List, Optional
+
+from core.logger import logger
+
+
+@dataclass
+class Session:
+    token: Optional[str] = None
+    token_obtained_at: Optional[float] = None
+    # Observed lifetime: how long the last token lasted before a 401.
+    token_lifetime: Optional[float] = None
+    cookies: List[dict] = field(default_factory=list)
+    user: Optional[dict] = None
+    user_saved_at: Optional[float] = None
+
+
+class SessionStore:
+    # Small JSON file with the cookie jar, auth token and last user payload so
+    # a restart can skip the /telegram, auth and user round trips. Written
+    # atomically and readable by the owner only, since it holds the token.
+    def __init__(self, path: str = "session.json"):
+        self.path = path
+        self.data = self._load()
+
+    def _load(self) -> Session:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return Session()
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable session file %s: %s", self.path, e)
+            return Session()
+        known = {f.name for f in fields(Session)}
+        return Session(**{key: value for key, value in raw.items() if key in known})
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(self.data), f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def update(self, **values):
+        for key, value in values.items():
+            setattr(self.data, key, value)
+        try:
+            self.save()
+        except OSError as e:
+            logger.warning("Could not save session to %s: %s", self.path, e)
+
+    def clear_token(self):
+        self.update(token=None, token_obtained_at=None)
@@ -1,10 +1,25 @@
-from api.http_client import GameApiClient
-from bot.game_bot import GameBot
-from core.config import config
+import sys
+
+# httpx loads its command-line client (click, rich, pygments) whenever those
+# are installed. The bot never uses it, and it is the bulk of startup time.
+sys.modules.setdefault("httpx._main", None)
+
+from api.http_client import GameApiClient  # noqa: E402
+from bot.game_bot import GameBot  # noqa: E402
+from core.config import config  # noqa: E402
+from core.history import history  # noqa: E402
+from core.metrics import metrics  # noqa: E402
+from core.profiling import profiler  # noqa: E402
+from core.session import SessionStore  # noqa: E402
 
 
 def main():
-    client = GameApiClient(config.APP_HOST)
+    if config.HISTORY_DB:
+        history.open(config.HISTORY_DB)
+    metrics.start(config.METRICS_PORT, config.METRICS_FILE, config.METRICS_INTERVAL)
+    if config.PROFILE:
+        profiler.enable(config.PROFILE, config.PROFILE_DIR)
+    client = GameApiClient(config.APP_HOST, session=SessionStore(config.SESSION_FILE))
     bot = GameBot(client)
     bot.run()
 
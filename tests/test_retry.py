@@ -0,0 +1,97 @@
+import httpx
+import pytest
+
+from api.http_client import GameApiClient
+from api.retry import RetryPolicy
+from benchmarks.mock_server import MockGameServer
+
+BUY = "/api/boost/buy"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_client(server, fail, retry):
+    # fail(request) returns a response or raises for the first hit on a path,
+    # then the request reaches the mock server.
+    seen = set()
+
+    def handler(request):
+        path = request.url.path
+        if path not in seen:
+            seen.add(path)
+            response = fail(request)
+            if response is not None:
+                return response
+        return server.handle(request)
+
+    return GameApiClient(
+        "http://mock", transport=httpx.MockTransport(handler), auth_data={}, retry=retry
+    )
+
+
+def buy_failure(kind):
+    def fail(request):
+        if request.url.path != BUY:
+            return None
+        if kind == "read_timeout":
+            raise httpx.ReadTimeout("slow", request=request)
+        if kind == "connect_error":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(int(kind))
+
+    return fail
+
+
+@pytest.mark.parametrize("kind", ["read_timeout", "503"])
+def test_buy_not_retried_once_it_may_have_reached_the_server(kind):
+    # A retry could pay for a second shield.
+    server = MockGameServer(seed=1)
+    client = make_client(server, buy_failure(kind), RetryPolicy(4, 0, 0, 5, 60))
+    with pytest.raises(httpx.HTTPError):
+        client.get_shield()
+    assert server.hits[BUY] == 0
+
+
+@pytest.mark.parametrize("kind", ["connect_error", "429"])
+def test_buy_retried_when_the_server_never_took_it(kind):
+    server = MockGameServer(seed=1)
+    client = make_client(server, buy_failure(kind), RetryPolicy(4, 0, 0, 5, 60))
+    client.get_shield()
+    assert server.hits[BUY] == 1
+
+
+@pytest.mark.parametrize("login_fails", [False, True])
+def test_half_open_probe_released_after_401(login_fails):
+    server = MockGameServer(seed=1)
+    clock = FakeClock()
+
+    def fail(request):
+        if request.url.path == "/api/user/get":
+            return httpx.Response(503)
+        return None
+
+    client = make_client(server, fail, RetryPolicy(1, 0, 0, 1, 60, clock=clock))
+    breaker = client.retry.breaker("/api/user/get")
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_user()
+    assert breaker.state == "open"
+
+    # The probe's token is rejected; with login failing as well the probe
+    # must still end, or the endpoint would stay half-open for good.
+    clock.now += 61
+    server.token = "rotated"
+    if login_fails:
+        server.endpoint_errors["/api/auth/telegram"] = 1.0
+        with pytest.raises(httpx.HTTPStatusError):
+            client.get_user()
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+    else:
+        client.get_user()
+        assert breaker.state == "closed"
@@ -0,0 +1,14 @@
+import pytest
+
+from benchmarks.simulate import POLICIES, simulate
+
+
+# Fixed starts keep the run repeatable; without the deadline margin both of
+# these sent a fuel buy a few milliseconds before its cooldown ended.
+@pytest.mark.parametrize("start", [1_700_000_000.0, 1_700_000_000.25])
+def test_default_policy_never_fires_early(start):
+    # A refused call is an action sent before the server considered it due.
+    result = simulate(POLICIES["default"], days=14, start=start)
+    assert result.refused == 0
+    assert result.failed == 0
+    assert result.actions["balance"] > 0